@@ -0,0 +1,31 @@
+"""add entitlements table
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'entitlements',
+        sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('active', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    )
+    # Background refresh scans for entitlements nearing expiry
+    op.create_index('ix_entitlements_expires_at', 'entitlements', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_entitlements_expires_at', table_name='entitlements')
+    op.drop_table('entitlements')
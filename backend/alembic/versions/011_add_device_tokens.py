@@ -0,0 +1,40 @@
+"""add device_tokens table
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'device_tokens',
+        sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('token', sa.String(500), primary_key=True),
+        sa.Column('platform', sa.String(10), nullable=True),
+        sa.Column('last_seen_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+    )
+    # Dead-token pruning and re-registration look tokens up without the user
+    op.create_index('ix_device_tokens_token', 'device_tokens', ['token'])
+    op.create_index('ix_device_tokens_last_seen_at', 'device_tokens', ['last_seen_at'])
+
+    # Existing single-device registrations become each user's first device
+    op.execute(
+        "INSERT INTO device_tokens (user_id, token, last_seen_at) "
+        "SELECT id, push_token, now() FROM users WHERE push_token IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_device_tokens_last_seen_at', table_name='device_tokens')
+    op.drop_index('ix_device_tokens_token', table_name='device_tokens')
+    op.drop_table('device_tokens')
@@ -0,0 +1,30 @@
+"""add updated_at to users, goals and posts
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+TABLES = ('users', 'goals', 'posts')
+
+
+def upgrade() -> None:
+    # Existing rows start at the migration time; the ORM bumps the column on
+    # every later UPDATE (onupdate), which the ETag version tokens rely on
+    for table in TABLES:
+        op.add_column(
+            table,
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_column(table, 'updated_at')
@@ -0,0 +1,139 @@
+"""
+Opt-in event-loop blocking detector (BLOCKING_DETECTOR_ENABLED=true).
+
+A heartbeat task on the loop updates a timestamp every few milliseconds; a
+watchdog thread notices when the heartbeat stops advancing for longer than
+BLOCKING_THRESHOLD_MS and samples the loop thread's stack *while it is still
+blocked*, so the report points at the code doing the blocking (Pillow,
+bcrypt, sync HTTP, file I/O) rather than the callback that happened to run.
+
+Stalls are aggregated per (route handler, blocking location) and served from
+/internal/loop-blocking; each one is also logged. Setting BLOCKING_ASYNCIO_DEBUG
+additionally turns on asyncio debug mode with slow_callback_duration set to
+the same threshold, which logs the slow handle itself (with debug-mode overhead).
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+_ROUTERS_DIR = os.path.join(_APP_DIR, "routers")
+MAX_STACK_DEPTH = 25
+
+
+class _StallSummary:
+    def __init__(self, route: str, location: str, stack: list[str]):
+        self.route = route
+        self.location = location
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.sample_stack = stack
+
+    def as_dict(self) -> dict:
+        return {
+            "route": self.route,
+            "location": self.location,
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 1),
+            "max_ms": round(self.max * 1000, 1),
+            "avg_ms": round(self.total / self.count * 1000, 1) if self.count else 0.0,
+            "sample_stack": self.sample_stack,
+        }
+
+
+class BlockingDetector:
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.heartbeat_interval = threshold / 4
+        self.summaries: dict[tuple[str, str], _StallSummary] = {}
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._heartbeat_task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if settings.BLOCKING_ASYNCIO_DEBUG:
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.threshold
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat_task = loop.create_task(self._beat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-blocking-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join, 1.0)
+
+    async def _beat(self) -> None:
+        while True:
+            self._heartbeat = time.monotonic()
+            await asyncio.sleep(self.heartbeat_interval)
+
+    def _watch(self) -> None:
+        stall_started: float | None = None
+        stall_stack: list[traceback.FrameSummary] = []
+        while not self._stop.wait(self.heartbeat_interval):
+            last_beat = self._heartbeat
+            stalled_for = time.monotonic() - last_beat - self.heartbeat_interval
+            if stall_started is None:
+                if stalled_for > self.threshold:
+                    frame = sys._current_frames().get(self._loop_thread_id)
+                    if frame is not None:
+                        stall_started = last_beat
+                        stall_stack = traceback.extract_stack(frame)
+            elif last_beat != stall_started:
+                # Heartbeat moved again — the stall is over
+                self._record(last_beat - stall_started - self.heartbeat_interval, stall_stack)
+                stall_started = None
+
+    def _record(self, duration: float, stack: list[traceback.FrameSummary]) -> None:
+        route = "-"
+        location = f"{stack[-1].filename}:{stack[-1].lineno} in {stack[-1].name}" if stack else "?"
+        for fs in stack:
+            # Outermost router frame names the handler; innermost app frame is
+            # the app code closest to the blocking call.
+            if route == "-" and fs.filename.startswith(_ROUTERS_DIR):
+                route = f"{os.path.basename(fs.filename)[:-3]}.{fs.name}"
+            if fs.filename.startswith(_APP_DIR):
+                location = f"{os.path.relpath(fs.filename, os.path.dirname(_APP_DIR))}:{fs.lineno} in {fs.name}"
+
+        logger.warning("Event loop blocked for %.0fms in %s at %s", duration * 1000, route, location)
+        with self._lock:
+            summary = self.summaries.get((route, location))
+            if summary is None:
+                formatted = [f"{fs.filename}:{fs.lineno} in {fs.name}" for fs in stack[-MAX_STACK_DEPTH:]]
+                summary = _StallSummary(route, location, formatted)
+                self.summaries[(route, location)] = summary
+            summary.count += 1
+            summary.total += duration
+            summary.max = max(summary.max, duration)
+
+    def report(self) -> list[dict]:
+        with self._lock:
+            summaries = sorted(self.summaries.values(), key=lambda s: s.total, reverse=True)
+            return [s.as_dict() for s in summaries]
+
+
+blocking_detector = BlockingDetector(settings.BLOCKING_THRESHOLD_MS / 1000)
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -7,12 +9,38 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "postgresql+asyncpg://streakd:streakd_password@db:5432/streakd"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: float = 10.0  # Seconds to wait for a free connection before erroring
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 15000  # Server-side statement_timeout; 0 disables
+    # Total Postgres connections this deployment may use across all workers on
+    # this host. When set, each worker's pool_size + max_overflow is capped at
+    # DB_MAX_CONNECTIONS // WEB_CONCURRENCY. 0 = use DB_POOL_SIZE/DB_MAX_OVERFLOW as-is.
+    DB_MAX_CONNECTIONS: int = 0
+    WEB_CONCURRENCY: int = 2  # Must match uvicorn --workers
+    # Set to "transaction" when DATABASE_URL points at PgBouncer in transaction
+    # pooling mode: disables asyncpg's statement cache, gives each prepared
+    # statement a unique name and hands pooling over to PgBouncer (NullPool).
+    # "session" keeps the app-side pool but still skips startup parameters.
+    # Validated so a typo fails startup instead of silently acting like "session"
+    DB_POOLER_MODE: Literal["none", "session", "transaction"] = "none"
+
+    # Optional streaming read replica for read-only endpoints (empty = disabled)
+    DATABASE_REPLICA_URL: str = ""
+    REPLICA_STICKY_SECONDS: float = 5.0  # Keep a user on the primary this long after they write
+    REPLICA_MAX_LAG_SECONDS: float = 5.0  # Route reads to the primary while lag exceeds this
+    REPLICA_HEALTH_CHECK_INTERVAL: float = 10.0
+    REPLICA_STICKY_STORE_TIMEOUT: float = 0.05  # Redis round trip for the shared write markers
 
     # JWT
     JWT_SECRET_KEY: str = "change-me-to-a-random-secret"
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    JWT_BACKEND: str = "jose"  # "jose" (python-jose) or "pyjwt"
+    JWT_DECODE_CACHE_SIZE: int = 4096  # Verified tokens cached per worker until exp; 0 disables
 
     # Cloudflare R2
     R2_ACCOUNT_ID: str = ""
@@ -20,9 +48,13 @@ class Settings(BaseSettings):
     R2_SECRET_ACCESS_KEY: str = ""
     R2_BUCKET_NAME: str = "streakd"
     R2_PUBLIC_URL: str = ""
+    R2_ENDPOINT_URL: str = ""  # overrides the account endpoint, e.g. a local MinIO for load tests
 
     # Notifications — Expo (legacy, for React Native app)
     EXPO_ACCESS_TOKEN: str = ""
+    PUSH_FEEDBACK_FLUSH_INTERVAL: float = 5.0  # seconds between batched dead-token prunes
+    DEVICE_TOKEN_MAX_AGE_DAYS: int = 90  # devices not re-registered for this long are pruned
+    NOTIFICATION_COALESCE_WINDOW: float = 30.0  # seconds reaction pushes are held and merged per recipient
     INTERNAL_API_SECRET: str = "change-me-to-a-random-secret"
 
     # Notifications — APNs (native iOS)
@@ -35,15 +67,66 @@ class Settings(BaseSettings):
     # Resend (transactional email)
     RESEND_API_KEY: str = ""
     EMAIL_FROM: str = "Streakd <no-reply@streakd.social>"
+    RESEND_API_BASE: str = "https://api.resend.com"  # point at a local stub for testing
+    EMAIL_SEND_CONCURRENCY: int = 4
+    EMAIL_MAX_RETRIES: int = 3
+    EMAIL_QUEUE_SIZE: int = 1000
 
     # RevenueCat (secret API key for server-side subscription verification)
     REVENUECAT_API_KEY: str = ""
+    REVENUECAT_WEBHOOK_AUTH: str = ""  # Authorization header value configured on the RevenueCat webhook
+    ENTITLEMENT_CACHE_TTL: float = 60.0  # seconds an entitlement is served from worker memory
+    ENTITLEMENT_MAX_AGE: float = 86400.0  # DB rows older than this are re-fetched in the background
+    ENTITLEMENT_REFRESH_AHEAD: float = 3600.0  # re-fetch active entitlements this long before expiry
+    ENTITLEMENT_SWEEP_INTERVAL: float = 300.0
+
+    # Rate limiting. memory:// keeps counters per worker process; point this at a
+    # Redis-compatible server (redis://host:6379/0 — Redis, Valkey, KeyDB,
+    # Dragonfly) so limits are shared across workers and replicas.
+    # Also holds the replica read-your-writes markers (see ReplicaRouter).
+    RATE_LIMIT_STORAGE_URI: str = "memory://"
+    RATE_LIMIT_STRATEGY: str = "sliding-window-counter"  # or fixed-window, moving-window
+
+    # Render list endpoints with orjson, skipping response_model re-validation
+    FAST_JSON_RESPONSES: bool = False
+
+    # Per-request SQL query budgets (see app/query_budget.py). Over-budget
+    # requests are logged; with ENFORCE on (tests/CI) they fail instead.
+    QUERY_BUDGET_DEFAULT: int = 20  # 0 = no default budget
+    QUERY_BUDGETS: dict[str, int] = {}  # e.g. {"GET /posts/feed": 4}
+    QUERY_BUDGET_ENFORCE: bool = False
+
+    # /health/ready and /health/live
+    HEALTH_CACHE_SECONDS: float = 2.0  # Probe results are reused for this long
+    HEALTH_DB_TIMEOUT: float = 1.0  # Max seconds for pool checkout + SELECT 1
+    HEALTH_MAX_LOOP_LAG: float = 0.25  # Not ready while recent loop lag exceeds this
+    HEALTH_LIVE_MAX_LOOP_LAG: float = 5.0  # Not live while recent loop lag exceeds this
+    HEALTH_MAX_EXECUTOR_QUEUE: int = 32  # Not ready while this many jobs wait for a thread
+    LOOP_LAG_SAMPLE_INTERVAL: float = 0.5
+
+    # Event-loop blocking diagnostics (see app/blocking_detector.py)
+    BLOCKING_DETECTOR_ENABLED: bool = False
+    BLOCKING_THRESHOLD_MS: int = 100
+    BLOCKING_ASYNCIO_DEBUG: bool = False  # Also enable asyncio debug mode (adds overhead)
+
+    # Bearer token for scraping /metrics. The x-internal-secret header is
+    # always accepted too; /metrics is never served without one of them.
+    METRICS_TOKEN: str = ""
 
     # CORS
     CORS_ORIGINS: list[str] = ["*"]
 
     model_config = {"env_file": ".env", "extra": "ignore"}
 
+    def db_pool_limits(self) -> tuple[int, int]:
+        """Return (pool_size, max_overflow) for a single worker's engine."""
+        if self.DB_MAX_CONNECTIONS <= 0:
+            return self.DB_POOL_SIZE, self.DB_MAX_OVERFLOW
+        per_worker = max(1, self.DB_MAX_CONNECTIONS // max(1, self.WEB_CONCURRENCY))
+        pool_size = min(self.DB_POOL_SIZE, per_worker)
+        # The budget only ever lowers the configured values
+        return pool_size, min(self.DB_MAX_OVERFLOW, max(0, per_worker - pool_size))
+
     def validate_secrets(self) -> list[str]:
         """Return warnings for any secrets still using default values."""
         warnings = []
@@ -1,11 +1,334 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, AsyncSession
-from sqlalchemy.orm import DeclarativeBase
+import asyncio
+import contextvars
+import logging
+import math
+import time
+import uuid
+from collections import OrderedDict
+
+import redis.asyncio as aioredis
+from sqlalchemy import event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, AsyncEngine, AsyncSession
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from app.config import settings
+from app.metrics import instrument_engine
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Per-worker connection pool counters, exported via /internal/db-pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.checkout_timeouts = 0
+        self.connect_errors = 0  # refused, auth, DNS... — anything but a pool timeout
+        self.connections_opened = 0
+        self.connections_closed = 0
+        self.peak_checked_out = 0
+        # id(connection_record) -> monotonic time the connection was opened
+        self.connection_opened_at: dict[int, float] = {}
+
+    def snapshot(self, pool) -> dict:
+        now = time.monotonic()
+        ages = [now - t for t in self.connection_opened_at.values()]
+        if isinstance(pool, NullPool):
+            # Pooling is delegated to PgBouncer — only connection churn is meaningful here
+            return {
+                "pooler_mode": settings.DB_POOLER_MODE,
+                "connections_open": len(ages),
+                "connections_opened": self.connections_opened,
+                "connections_closed": self.connections_closed,
+            }
+        pool_size, max_overflow = settings.db_pool_limits()
+        capacity = pool_size + max_overflow
+        checked_out = pool.checkedout()
+        return {
+            "workers": settings.WEB_CONCURRENCY,
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "checked_out": checked_out,
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+            "peak_checked_out": self.peak_checked_out,
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.checkout_timeouts,
+            "connect_errors": self.connect_errors,
+            "checkout_wait_avg_ms": round(self.checkout_wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "checkout_wait_max_ms": round(self.checkout_wait_max * 1000, 3),
+            "connections_open": len(ages),
+            "connections_opened": self.connections_opened,
+            "connections_closed": self.connections_closed,
+            "connection_age_max_s": round(max(ages), 1) if ages else 0.0,
+            "connection_age_avg_s": round(sum(ages) / len(ages), 1) if ages else 0.0,
+        }
+
+
+pool_stats = PoolStats()
+replica_pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that times how long each checkout waits for a connection.
+    Subclassed per engine (see _engine_kwargs) so each pool has its own stats."""
+
+    stats: PoolStats = pool_stats
+
+    def connect(self):
+        stats = self.stats
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except PoolTimeoutError:
+            stats.checkout_timeouts += 1
+            raise
+        except Exception:
+            stats.connect_errors += 1
+            raise
+        waited = time.perf_counter() - start
+        stats.checkouts += 1
+        stats.checkout_wait_total += waited
+        if waited > stats.checkout_wait_max:
+            stats.checkout_wait_max = waited
+        checked_out = self.checkedout()
+        if checked_out > stats.peak_checked_out:
+            stats.peak_checked_out = checked_out
+        return conn
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False)
+
+def _engine_kwargs(stats: PoolStats) -> dict:
+    kwargs = {"echo": False}
+    connect_args = {}
+
+    if settings.DB_POOLER_MODE == "transaction":
+        # PgBouncer hands each transaction to an arbitrary server connection, so
+        # named prepared statements from a previous transaction may not exist
+        # (or may collide). Disable both statement caches and use unique names.
+        kwargs["poolclass"] = NullPool
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    else:
+        pool_size, max_overflow = settings.db_pool_limits()
+        kwargs.update(
+            poolclass=type("InstrumentedQueuePool", (InstrumentedQueuePool,), {"stats": stats}),
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+
+    # PgBouncer rejects unknown startup parameters, so behind a pooler the
+    # statement_timeout has to come from the role instead:
+    #   ALTER ROLE streakd SET statement_timeout = '15s';
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0 and settings.DB_POOLER_MODE == "none":
+        connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+
+    if connect_args:
+        kwargs["connect_args"] = connect_args
+    return kwargs
+
+
+def _create_engine(url: str, stats: PoolStats, name: str) -> AsyncEngine:
+    new_engine = create_async_engine(url, **_engine_kwargs(stats))
+    instrument_engine(new_engine.sync_engine, name)
+
+    @event.listens_for(new_engine.sync_engine.pool, "connect")
+    def _on_pool_connect(dbapi_connection, connection_record):
+        stats.connections_opened += 1
+        stats.connection_opened_at[id(connection_record)] = time.monotonic()
+
+    @event.listens_for(new_engine.sync_engine.pool, "close")
+    def _on_pool_close(dbapi_connection, connection_record):
+        stats.connections_closed += 1
+        stats.connection_opened_at.pop(id(connection_record), None)
+
+    return new_engine
+
+
+engine = _create_engine(settings.DATABASE_URL, pool_stats, "primary")
 async_session = async_sessionmaker(engine, expire_on_commit=False)
 
+# Optional read replica. Read-only handlers get it through
+# dependencies.get_read_db; everything else stays on the primary.
+replica_engine = (
+    _create_engine(settings.DATABASE_REPLICA_URL, replica_pool_stats, "replica")
+    if settings.DATABASE_REPLICA_URL
+    else None
+)
+replica_session = (
+    async_sessionmaker(replica_engine, expire_on_commit=False)
+    if replica_engine is not None
+    else None
+)
+
+# Set by dependencies.get_current_user so session events can attribute writes
+current_user_id: contextvars.ContextVar[uuid.UUID | None] = contextvars.ContextVar("current_user_id", default=None)
+
+
+class ReplicaRouter:
+    """Decides per request whether reads may go to the replica.
+
+    Reads fall back to the primary when:
+      - no replica is configured, or the last health probe failed
+      - replication lag exceeds REPLICA_MAX_LAG_SECONDS
+      - the requesting user wrote within the sticky window
+        (max(REPLICA_STICKY_SECONDS, current lag)), so they read their own writes
+
+    Recent writers are tracked per worker in a bounded LRU and, because a
+    user's next read may land on another worker, also as an expiring marker
+    in Redis when RATE_LIMIT_STORAGE_URI points at one. Markers are written
+    in the background and read with a REPLICA_STICKY_STORE_TIMEOUT socket
+    timeout, so Redis never blocks the event loop; if the read fails the
+    request goes to the primary. With memory:// (or any non-Redis store)
+    stickiness only holds within one worker.
+    """
+
+    MAX_TRACKED_WRITERS = 10_000
+
+    def __init__(self):
+        self.healthy = replica_engine is not None
+        self.lag_seconds = 0.0
+        self.last_probe = 0.0
+        self._probe_task: asyncio.Task | None = None
+        self._recent_writers: OrderedDict[uuid.UUID, float] = OrderedDict()
+        self._shared: aioredis.Redis | None = None
+        self._pending_markers: set[asyncio.Task] = set()
+        if replica_engine is not None and settings.RATE_LIMIT_STORAGE_URI.startswith(("redis://", "rediss://")):
+            self._shared = aioredis.from_url(
+                settings.RATE_LIMIT_STORAGE_URI,
+                socket_timeout=settings.REPLICA_STICKY_STORE_TIMEOUT,
+                socket_connect_timeout=settings.REPLICA_STICKY_STORE_TIMEOUT,
+            )
+
+    def sticky_window(self) -> float:
+        return max(settings.REPLICA_STICKY_SECONDS, self.lag_seconds)
+
+    @staticmethod
+    def _shared_key(user_id: uuid.UUID) -> str:
+        return f"streakd:replica-sticky:{user_id}"
+
+    def record_write(self, user_id: uuid.UUID) -> None:
+        # Called from sync session hooks, so the shared marker is set in the
+        # background rather than awaited
+        self._recent_writers[user_id] = time.monotonic()
+        self._recent_writers.move_to_end(user_id)
+        if len(self._recent_writers) > self.MAX_TRACKED_WRITERS:
+            self._recent_writers.popitem(last=False)
+        if self._shared is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._set_marker(user_id, self.sticky_window()))
+        self._pending_markers.add(task)
+        task.add_done_callback(self._pending_markers.discard)
+
+    async def _set_marker(self, user_id: uuid.UUID, window: float) -> None:
+        try:
+            await self._shared.set(self._shared_key(user_id), 1, px=math.ceil(window * 1000))
+        except Exception as e:
+            logger.warning("Could not record write marker in shared store: %s", e)
+
+    async def _wrote_recently(self, user_id: uuid.UUID | None) -> bool:
+        if user_id is None:
+            return False
+        wrote_at = self._recent_writers.get(user_id)
+        if wrote_at is not None:
+            if time.monotonic() - wrote_at < self.sticky_window():
+                return True
+            del self._recent_writers[user_id]
+        if self._shared is None:
+            return False
+        try:
+            return bool(await self._shared.exists(self._shared_key(user_id)))
+        except Exception as e:
+            # Can't tell: read from the primary rather than risk a stale read
+            logger.warning("Could not read write marker from shared store: %s", e)
+            return True
+
+    async def use_replica(self, user_id: uuid.UUID | None) -> bool:
+        if replica_session is None:
+            return False
+        self._maybe_probe()
+        if not self.healthy or self.lag_seconds > settings.REPLICA_MAX_LAG_SECONDS:
+            return False
+        return not await self._wrote_recently(user_id)
+
+    async def close(self) -> None:
+        if self._shared is not None:
+            await asyncio.gather(*self._pending_markers, return_exceptions=True)
+            await self._shared.aclose()
+
+    def mark_unhealthy(self, reason: str) -> None:
+        if self.healthy:
+            logger.warning("Read replica marked unhealthy, routing reads to primary: %s", reason)
+        self.healthy = False
+        self.last_probe = time.monotonic()
+
+    def _maybe_probe(self) -> None:
+        # Probes run in the background so no request waits on the replica check
+        if time.monotonic() - self.last_probe < settings.REPLICA_HEALTH_CHECK_INTERVAL:
+            return
+        if self._probe_task is not None and not self._probe_task.done():
+            return
+        self.last_probe = time.monotonic()
+        self._probe_task = asyncio.get_running_loop().create_task(self.probe())
+
+    async def probe(self) -> None:
+        try:
+            async with replica_engine.connect() as conn:
+                result = await asyncio.wait_for(
+                    conn.execute(text(
+                        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+                    )),
+                    timeout=settings.REPLICA_HEALTH_CHECK_INTERVAL,
+                )
+                self.lag_seconds = float(result.scalar() or 0.0)
+            if not self.healthy:
+                logger.info("Read replica healthy again (lag %.2fs)", self.lag_seconds)
+            self.healthy = True
+        except Exception as e:
+            self.mark_unhealthy(str(e))
+        finally:
+            self.last_probe = time.monotonic()
+
+    def snapshot(self) -> dict:
+        return {
+            "configured": replica_engine is not None,
+            "healthy": self.healthy,
+            "lag_seconds": round(self.lag_seconds, 3),
+            "sticky_window_seconds": self.sticky_window(),
+            "tracked_writers": len(self._recent_writers),
+        }
+
+
+replica_router = ReplicaRouter()
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flush_write(session, flush_context):
+    user_id = current_user_id.get()
+    if user_id is not None:
+        replica_router.record_write(user_id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_statement_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        user_id = current_user_id.get()
+        if user_id is not None:
+            replica_router.record_write(user_id)
+
 
 class Base(DeclarativeBase):
     pass
@@ -1,11 +1,14 @@
+import asyncio
 import uuid
+from typing import AsyncIterator
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import current_user_id, get_db, replica_router, replica_session
 from app.models.user import User
 from app.services.auth import decode_token
 
@@ -30,6 +33,7 @@ async def get_current_user(
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
+    current_user_id.set(user.id)
     return user
 
 
@@ -39,3 +43,35 @@ async def get_verified_user(
     if not current_user.email_verified:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Email not verified")
     return current_user
+
+
+async def get_read_db(
+    current_user: User = Depends(get_current_user),
+    primary: AsyncSession = Depends(get_db),
+) -> AsyncIterator[AsyncSession]:
+    """Session for read-only handlers. Uses the read replica when one is
+    configured, healthy, not lagging and the user hasn't just written;
+    otherwise (or if the replica connection fails) falls back to the primary,
+    reusing the request's get_db session rather than opening another.
+
+    Never write through this session — replicas are read-only.
+    """
+    if await replica_router.use_replica(current_user.id):
+        session = replica_session()
+        try:
+            # Check out the connection up front so a dead replica fails over
+            # before the handler runs instead of erroring mid-request
+            await session.connection()
+        except PoolTimeoutError:
+            # Replica pool exhausted: this request reads from the primary, but
+            # the replica itself is fine, so don't take it out of rotation
+            await session.close()
+        except (SQLAlchemyError, OSError, asyncio.TimeoutError) as e:
+            await session.close()
+            replica_router.mark_unhealthy(str(e))
+        else:
+            async with session:
+                yield session
+            return
+
+    yield primary
@@ -0,0 +1,140 @@
+"""
+Readiness and liveness probes.
+
+A background LoopLagMonitor samples event-loop scheduling delay, so blocking
+work on the loop (Pillow, bcrypt, sync HTTP) shows up as lag. Probe results
+are cached for HEALTH_CACHE_SECONDS and computed by a single caller at a time,
+so load-balancer polling stays cheap however often it hits the worker.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+import anyio.to_thread
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import engine
+from app.metrics import event_loop_lag, event_loop_lag_samples
+
+
+class LoopLagMonitor:
+    """Sleeps for a fixed interval and records how late the loop woke it up."""
+
+    WINDOW = 20  # samples kept for the recent-max figure (~10s at 0.5s interval)
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: deque[float] = deque(maxlen=self.WINDOW)
+        self.last_sample_at = 0.0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self.last_sample_at = time.monotonic()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def recent_max(self) -> float:
+        return max(self.samples, default=0.0)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - scheduled - self.interval)
+            self.samples.append(lag)
+            self.last_sample_at = time.monotonic()
+            event_loop_lag.set(lag)
+            event_loop_lag_samples.observe(lag)
+
+
+loop_monitor = LoopLagMonitor(settings.LOOP_LAG_SAMPLE_INTERVAL)
+
+
+def _executor_queue_depth() -> dict:
+    # asyncio.to_thread (R2 uploads) uses the loop's default executor;
+    # FastAPI runs sync dependencies and UploadFile I/O on anyio's thread pool.
+    loop = asyncio.get_running_loop()
+    executor = getattr(loop, "_default_executor", None)
+    default_queued = executor._work_queue.qsize() if executor is not None else 0
+    anyio_stats = anyio.to_thread.current_default_thread_limiter().statistics()
+    return {
+        "default_executor_queued": default_queued,
+        "anyio_threads_busy": anyio_stats.borrowed_tokens,
+        "anyio_tasks_waiting": anyio_stats.tasks_waiting,
+    }
+
+
+async def _probe_db() -> dict:
+    start = time.perf_counter()
+    try:
+        async with asyncio.timeout(settings.HEALTH_DB_TIMEOUT):
+            async with engine.connect() as conn:
+                checkout = time.perf_counter() - start
+                await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        return {"ok": False, "error": type(e).__name__, "latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+    return {
+        "ok": True,
+        "checkout_ms": round(checkout * 1000, 1),
+        "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+class _CachedProbe:
+    def __init__(self, probe):
+        self._probe = probe
+        self._result: dict | None = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> dict:
+        if self._result is not None and time.monotonic() < self._expires_at:
+            return self._result
+        async with self._lock:
+            # Another caller may have refreshed it while we waited
+            if self._result is None or time.monotonic() >= self._expires_at:
+                self._result = await self._probe()
+                self._expires_at = time.monotonic() + settings.HEALTH_CACHE_SECONDS
+        return self._result
+
+
+async def _readiness() -> dict:
+    db = await _probe_db()
+    lag = loop_monitor.recent_max
+    executor = _executor_queue_depth()
+    queued = executor["default_executor_queued"] + executor["anyio_tasks_waiting"]
+    checks = {
+        "database": db,
+        "event_loop": {"ok": lag <= settings.HEALTH_MAX_LOOP_LAG, "lag_ms": round(lag * 1000, 1)},
+        "executor": {"ok": queued <= settings.HEALTH_MAX_EXECUTOR_QUEUE, **executor},
+    }
+    return {"ready": all(c["ok"] for c in checks.values()), "checks": checks}
+
+
+async def _liveness() -> dict:
+    lag = loop_monitor.recent_max
+    # A monitor that stopped sampling means the loop (or the task) is wedged
+    stale = time.monotonic() - loop_monitor.last_sample_at > max(5.0, loop_monitor.interval * 10)
+    alive = loop_monitor.running and not stale and lag <= settings.HEALTH_LIVE_MAX_LOOP_LAG
+    return {"alive": alive, "event_loop_lag_ms": round(lag * 1000, 1), "monitor_running": loop_monitor.running}
+
+
+readiness = _CachedProbe(_readiness)
+liveness = _CachedProbe(_liveness)
@@ -0,0 +1,63 @@
+"""
+Conditional GETs (ETag / If-None-Match) for per-user read endpoints.
+
+A handler derives a version token from a few cheap values that change
+whenever its response would (counts and max(updated_at) of the rows it
+serves). When the client already holds that version it gets a bodyless 304
+and the handler skips its main query and serialization; otherwise the token
+goes out as the ETag of the full response.
+
+Responses are "private, no-cache": they depend on the viewer, and clients may
+keep them but must revalidate on every use — a cheap round trip when nothing
+has changed.
+"""
+
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response
+
+CACHE_CONTROL = "private, no-cache"
+
+# Bump when a cached endpoint's response shape changes so clients holding
+# bodies in the old shape stop getting 304s
+RESPONSE_FORMAT = 1
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag over the version values. Weak because it identifies the data,
+    not the exact bytes (JSON rendering may differ between code paths)."""
+    digest = hashlib.blake2b(repr((RESPONSE_FORMAT, *parts)).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def wants_revalidation(request: Request) -> bool:
+    return "if-none-match" in request.headers
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110 §8.8.3.2): the W/ prefix is ignored
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def with_etag(content: Any, response: Response, etag: str) -> Any:
+    """Attach the caching headers and return `content` unchanged.
+
+    `content` may itself be a Response (fast_list with FAST_JSON_RESPONSES on),
+    in which case FastAPI ignores the injected `response`, so the headers go on
+    `content` directly.
+    """
+    target = content if isinstance(content, Response) else response
+    target.headers["ETag"] = etag
+    target.headers["Cache-Control"] = CACHE_CONTROL
+    return content
@@ -0,0 +1,117 @@
+"""
+Long-lived outbound HTTP clients, one per external service.
+
+Each service gets a named httpx.AsyncClient with its own connection limits,
+timeouts and HTTP/2 setting, so connections (and their DNS lookups and TLS
+sessions) are reused across calls instead of being rebuilt per request. The
+clients are opened in the app lifespan and closed on shutdown; `get()` also
+opens a client lazily so scripts and workers outside the app can use it.
+
+Tests can route a service to a fake without touching the call sites:
+
+    await clients.use_transport("expo", httpx.MockTransport(handler))
+"""
+
+import httpx
+
+from app.config import settings
+
+
+class ClientSpec:
+    def __init__(
+        self,
+        base_url: str,
+        timeout: httpx.Timeout,
+        limits: httpx.Limits,
+        http2: bool = False,
+        headers: dict | None = None,
+    ):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.limits = limits
+        self.http2 = http2
+        self.headers = headers or {}
+
+
+class HTTPClientRegistry:
+    def __init__(self):
+        self.specs: dict[str, ClientSpec] = {}
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._transports: dict[str, httpx.AsyncBaseTransport] = {}
+
+    def register(self, name: str, spec: ClientSpec) -> None:
+        self.specs[name] = spec
+
+    def _build(self, name: str) -> httpx.AsyncClient:
+        spec = self.specs[name]
+        return httpx.AsyncClient(
+            base_url=spec.base_url,
+            timeout=spec.timeout,
+            limits=spec.limits,
+            http2=spec.http2,
+            headers=spec.headers,
+            transport=self._transports.get(name),
+        )
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._build(name)
+            self._clients[name] = client
+        return client
+
+    def open(self) -> None:
+        for name in self.specs:
+            self.get(name)
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    async def use_transport(self, name: str, transport: httpx.AsyncBaseTransport | None) -> None:
+        """Send `name`'s requests through `transport` (None restores the real
+        network). Takes effect immediately; the replaced client is closed."""
+        if transport is None:
+            self._transports.pop(name, None)
+        else:
+            self._transports[name] = transport
+        client = self._clients.pop(name, None)
+        if client is not None:
+            await client.aclose()
+
+
+def _timeout(total: float, connect: float = 5.0) -> httpx.Timeout:
+    return httpx.Timeout(total, connect=connect)
+
+
+clients = HTTPClientRegistry()
+
+clients.register("expo", ClientSpec(
+    base_url="https://exp.host",
+    timeout=_timeout(10.0),
+    limits=httpx.Limits(max_connections=20, max_keepalive_connections=20, keepalive_expiry=60.0),
+    headers={"Accept": "application/json", "Content-Type": "application/json"},
+))
+# APNs requires HTTP/2; one connection multiplexes many concurrent pushes
+clients.register("apns", ClientSpec(
+    base_url="https://api.sandbox.push.apple.com" if settings.APNS_USE_SANDBOX else "https://api.push.apple.com",
+    timeout=_timeout(10.0),
+    limits=httpx.Limits(max_connections=4, max_keepalive_connections=4, keepalive_expiry=300.0),
+    http2=True,
+))
+clients.register("revenuecat", ClientSpec(
+    base_url="https://api.revenuecat.com/v1",
+    timeout=_timeout(5.0, connect=3.0),
+    limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+    headers={"Authorization": f"Bearer {settings.REVENUECAT_API_KEY}", "Content-Type": "application/json"},
+))
+clients.register("resend", ClientSpec(
+    base_url=settings.RESEND_API_BASE,
+    timeout=_timeout(10.0),
+    limits=httpx.Limits(
+        max_connections=settings.EMAIL_SEND_CONCURRENCY,
+        max_keepalive_connections=settings.EMAIL_SEND_CONCURRENCY,
+    ),
+    headers={"Authorization": f"Bearer {settings.RESEND_API_KEY}"},
+))
@@ -1,7 +1,15 @@
-from fastapi import Request
+import math
+import time
+from collections import OrderedDict
+
+from fastapi import Depends, HTTPException, Request, status
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
+from app.config import settings
+from app.dependencies import get_verified_user
+from app.models.user import User
+
 
 def _client_ip(request: Request) -> str:
     """Resolve the real client IP behind a reverse proxy (nginx).
@@ -19,4 +27,71 @@ def _client_ip(request: Request) -> str:
     return get_remote_address(request)
 
 
-limiter = Limiter(key_func=_client_ip)
+# sliding-window-counter keeps two counters per key (current + previous window)
+# and is updated atomically in Redis via Lua, so memory stays bounded no matter
+# how many requests a key sees. If the shared store becomes unreachable the
+# limiter falls back to per-process memory rather than failing requests.
+limiter = Limiter(
+    key_func=_client_ip,
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI,
+    strategy=settings.RATE_LIMIT_STRATEGY,
+    in_memory_fallback_enabled=settings.RATE_LIMIT_STORAGE_URI != "memory://",
+    swallow_errors=True,
+    key_prefix="streakd",
+)
+
+
+class TokenBucketLimiter:
+    """In-process token buckets keyed on (limit name, user id).
+
+    Buckets refill lazily on access — there is no timer — and the table is an
+    LRU capped at `max_buckets`, so every check is O(1) with no I/O. An evicted
+    bucket comes back full, which only ever errs towards allowing a request.
+    Counters are per worker; this complements the shared IP limits above
+    rather than replacing them.
+    """
+
+    def __init__(self, max_buckets: int = 50_000):
+        self.max_buckets = max_buckets
+        # key -> [tokens, last refill (monotonic seconds)]
+        self._buckets: OrderedDict[tuple, list[float]] = OrderedDict()
+
+    def take(self, key: tuple, capacity: float, refill_per_second: float) -> float:
+        """Consume one token. Returns 0 if allowed, else seconds until a token is available."""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [capacity, now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            tokens = bucket[0] + (now - bucket[1]) * refill_per_second
+            bucket[0] = capacity if tokens > capacity else tokens
+            bucket[1] = now
+
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            return 0.0
+        return (1.0 - bucket[0]) / refill_per_second
+
+
+user_buckets = TokenBucketLimiter()
+
+
+def user_rate_limit(name: str, capacity: int, per_seconds: int):
+    """Dependency enforcing `capacity` requests per `per_seconds` per authenticated user,
+    with bursts up to `capacity`. Use as `_: None = Depends(user_rate_limit(...))`."""
+    refill_per_second = capacity / per_seconds
+
+    async def _check(current_user: User = Depends(get_verified_user)) -> None:
+        retry_after = user_buckets.take((name, current_user.id), capacity, refill_per_second)
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests. Please try again later.",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    return _check
@@ -1,17 +1,67 @@
 import logging
+import secrets
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from slowapi.errors import RateLimitExceeded
 
 from app.config import settings
+from app.database import replica_router
+from app.blocking_detector import blocking_detector
+from app.health import loop_monitor
+from app.http_clients import clients
 from app.limiter import limiter
-from app.routers import auth, users, goals, posts, reactions, friends, notifications, blocks
+from app.metrics import MetricsMiddleware, render_metrics
+from app.query_budget import QueryBudgetMiddleware
+from app.responses import FastJSONResponse
+from app.services.email import email_sender
+from app.services.notifications import apns_configured, apns_tokens
+from app.services.notification_buffer import reaction_notifications
+from app.services.push_feedback import push_feedback
+from app.services.revenuecat import entitlements
+from app.routers import auth, users, goals, posts, reactions, friends, notifications, blocks, stats, health, webhooks
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Streakd API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    clients.open()
+    loop_monitor.start()
+    if settings.BLOCKING_DETECTOR_ENABLED:
+        blocking_detector.start()
+    email_sender.start()
+    entitlements.start()
+    push_feedback.start()
+    if apns_configured():
+        # Sign the first provider token up front and keep it fresh. A bad key
+        # only breaks iOS pushes, not startup; the refresher keeps retrying.
+        try:
+            await apns_tokens.get_token()
+        except Exception:
+            logger.exception("APNs provider token could not be signed at startup")
+            apns_tokens.start()
+    yield
+    await reaction_notifications.stop()
+    await apns_tokens.stop()
+    await push_feedback.stop()
+    await entitlements.stop()
+    await email_sender.stop()
+    if settings.BLOCKING_DETECTOR_ENABLED:
+        await blocking_detector.stop()
+    await loop_monitor.stop()
+    await replica_router.close()
+    await clients.aclose()
+
+
+app = FastAPI(
+    title="Streakd API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse if settings.FAST_JSON_RESPONSES else JSONResponse,
+)
 app.state.limiter = limiter
 
 
@@ -40,6 +90,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(QueryBudgetMiddleware)
+# Added last so it is outermost and times the full request, including CORS
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -49,8 +102,25 @@ app.include_router(reactions.router)
 app.include_router(friends.router)
 app.include_router(notifications.router)
 app.include_router(blocks.router)
+app.include_router(stats.router)
+app.include_router(health.router)
+app.include_router(webhooks.router)
 
 
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    # Scrapers authenticate with METRICS_TOKEN as a bearer token, or with the
+    # internal secret like the other /internal endpoints. Never served openly.
+    # Compared as bytes: compare_digest rejects non-ASCII str, and headers
+    # arrive latin-1 decoded
+    auth = request.headers.get("authorization", "").encode()
+    internal = request.headers.get("x-internal-secret", "").encode()
+    token_ok = bool(settings.METRICS_TOKEN) and secrets.compare_digest(auth, f"Bearer {settings.METRICS_TOKEN}".encode())
+    if not token_ok and not secrets.compare_digest(internal, settings.INTERNAL_API_SECRET.encode()):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,193 @@
+"""
+Minimal Prometheus-compatible metrics: counters, gauges and histograms with
+text exposition, an ASGI middleware for per-route HTTP latency, SQLAlchemy
+engine hooks for query timing, and a timer for outbound service calls.
+
+Everything lives in process memory, so each uvicorn worker reports its own
+series. Scrape each worker directly, or aggregate with sum() across the `pid`
+label, which every series carries.
+"""
+
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app import query_budget
+
+# Seconds. Fine-grained at the low end where DB queries and cached requests land.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_PID = str(os.getpid())
+
+
+def _escape(value) -> str:
+    # Text exposition format: backslash, double quote and newline are escaped
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    parts.append(f'pid="{_PID}"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}"
+
+
+class Gauge:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name}{_format_labels((), ())} {self.value}",
+        ]
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = labels
+        self.buckets = buckets
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *label_values) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            self._series[label_values] = series
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for values, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.label_names, values, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.label_names, values)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+http_request_duration = Histogram(
+    "streakd_http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status"),
+)
+http_requests_in_flight = Gauge("streakd_http_requests_in_flight", "HTTP requests currently being handled")
+db_query_duration = Histogram(
+    "streakd_db_query_duration_seconds", "SQL statement execution time", ("database", "operation"),
+)
+external_call_duration = Histogram(
+    "streakd_external_call_duration_seconds", "Outbound service call latency", ("service", "outcome"),
+)
+
+event_loop_lag = Gauge("streakd_event_loop_lag_seconds", "Most recent event-loop scheduling delay")
+event_loop_lag_samples = Histogram(
+    "streakd_event_loop_lag_sample_seconds", "Event-loop scheduling delay samples",
+)
+
+REGISTRY = [
+    http_request_duration, http_requests_in_flight, db_query_duration, external_call_duration,
+    event_loop_lag, event_loop_lag_samples,
+]
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware task overhead). The route
+    label is the matched path template, e.g. /users/profile/{user_id}, so
+    series cardinality stays bounded; unmatched paths are grouped as "unmatched"."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status_code,
+            )
+
+
+def instrument_engine(engine, database: str) -> None:
+    """Record every statement's execution time on the given (sync) engine,
+    both in the histogram and in the current request's query budget."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        query_budget.before_query()
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement else "OTHER"
+        db_query_duration.observe(elapsed, database, operation)
+        query_budget.after_query(statement, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+
+@contextmanager
+def time_external(service: str):
+    """Time an outbound call: `with time_external("apns"): ...`"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        external_call_duration.observe(time.perf_counter() - start, service, outcome)
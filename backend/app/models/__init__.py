@@ -7,5 +7,7 @@ from app.models.notification import NotificationSettings
 from app.models.block import Block
 from app.models.report import Report
 from app.models.verification_code import VerificationCode
+from app.models.entitlement import Entitlement
+from app.models.device_token import DeviceToken
 
-__all__ = ["User", "Goal", "Post", "Reaction", "Friendship", "NotificationSettings", "Block", "Report", "VerificationCode"]
+__all__ = ["User", "Goal", "Post", "Reaction", "Friendship", "NotificationSettings", "Block", "Report", "VerificationCode", "Entitlement", "DeviceToken"]
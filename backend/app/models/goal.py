@@ -25,6 +25,12 @@ class Goal(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
+    # Bumped on every UPDATE; feeds the ETag version tokens (app/http_cache.py)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
 
     user: Mapped["User"] = relationship("User", back_populates="goals")
     posts: Mapped[list["Post"]] = relationship("Post", back_populates="goal", cascade="all, delete-orphan")
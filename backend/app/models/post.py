@@ -19,6 +19,12 @@ class Post(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
+    # Bumped on every UPDATE; feeds the ETag version tokens (app/http_cache.py)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
     reaction_fire: Mapped[int] = mapped_column(Integer, default=0)
     reaction_fist: Mapped[int] = mapped_column(Integer, default=0)
     reaction_party: Mapped[int] = mapped_column(Integer, default=0)
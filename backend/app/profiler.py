@@ -0,0 +1,98 @@
+"""
+In-process statistical profiler for live workers.
+
+A timer thread snapshots thread stacks via sys._current_frames() at a fixed
+interval and counts identical stacks. Output is the "collapsed" format used by
+flamegraph.pl / speedscope / inferno:
+
+    main (app/main.py:1);handler (app/routers/posts.py:80) 42
+
+Sampling only reads frame objects, so overhead is roughly proportional to the
+sampling rate and stack depth, not to the amount of work being profiled.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+MAX_DURATION_SECONDS = 60.0
+MIN_INTERVAL_SECONDS = 0.001
+
+_SITE_MARKERS = ("site-packages" + os.sep, "dist-packages" + os.sep)
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    for marker in _SITE_MARKERS:
+        idx = filename.find(marker)
+        if idx != -1:
+            filename = filename[idx + len(marker):]
+            break
+    else:
+        if os.path.isabs(filename):
+            rel = os.path.relpath(filename)
+            # Outside the app (stdlib): keep just "package/module.py"
+            filename = rel if not rel.startswith("..") else os.sep.join(filename.split(os.sep)[-2:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _collapse(frame) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def run(self, duration: float, interval: float, thread_id: int | None = None) -> tuple[Counter, int]:
+        """Sample for `duration` seconds (blocking — call from a worker thread).
+        Profiles only `thread_id` when given (e.g. the event loop thread), else every
+        thread except the sampler. Returns (collapsed stack counts, samples taken)."""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running on this worker")
+        try:
+            duration = min(duration, MAX_DURATION_SECONDS)
+            interval = max(interval, MIN_INTERVAL_SECONDS)
+            own_id = threading.get_ident()
+            stacks: Counter = Counter()
+            samples = 0
+            deadline = time.monotonic() + duration
+            next_tick = time.monotonic()
+            while True:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                for tid, frame in sys._current_frames().items():
+                    if tid == own_id or (thread_id is not None and tid != thread_id):
+                        continue
+                    stacks[_collapse(frame)] += 1
+                samples += 1
+                next_tick += interval
+                sleep_for = next_tick - time.monotonic()
+                if sleep_for > 0:
+                    time.sleep(sleep_for)
+                else:
+                    # Fell behind (heavy GIL contention) — don't try to catch up
+                    next_tick = time.monotonic()
+            return stacks, samples
+        finally:
+            self._lock.release()
+
+
+profiler = SamplingProfiler()
+
+
+def format_collapsed(stacks: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
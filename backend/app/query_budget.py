@@ -0,0 +1,143 @@
+"""
+Per-request SQL query accounting.
+
+QueryBudgetMiddleware opens a request-scoped QueryStats; the engine hooks in
+app.metrics feed it every statement. When the request finishes its query
+count and DB time are logged, and requests over their route's budget — or
+that repeat one statement N_PLUS_ONE_THRESHOLD+ times — are logged as
+warnings. With QUERY_BUDGET_ENFORCE=true (tests/CI) the query that crosses
+the budget raises QueryBudgetExceeded instead, failing the request.
+"""
+
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Worst-case query counts for the known multi-query handlers, including the
+# current-user lookup done by get_current_user. Routes not listed here use
+# QUERY_BUDGET_DEFAULT. Overridable per route via QUERY_BUDGETS.
+ROUTE_QUERY_BUDGETS = {
+    "POST /reactions/toggle": 9,
+    "GET /users/profile/{user_id}": 3,
+    "POST /friends/request": 7,
+    "GET /posts/feed": 5,
+}
+
+N_PLUS_ONE_THRESHOLD = 5
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+class QueryStats:
+    def __init__(self, route_key: str | None = None, budget: int | None = None, scope: dict | None = None):
+        self.route_key = route_key
+        self.budget = budget
+        self.count = 0
+        self.db_time = 0.0
+        self.statements: dict[str, int] = {}
+        # The route template only appears in the ASGI scope once routing has
+        # run, so request stats resolve their route/budget on first query.
+        self.scope = scope
+        # Enclosing count_queries() block, if any, which also sees these queries
+        self.parent: QueryStats | None = None
+
+    def resolve_route(self) -> None:
+        if self.route_key is not None or self.scope is None:
+            return
+        route = self.scope.get("route")
+        if route is not None:
+            self.route_key = f"{self.scope['method']} {route.path}"
+            self.budget = budget_for(self.route_key)
+
+
+_current: contextvars.ContextVar[QueryStats | None] = contextvars.ContextVar("query_stats", default=None)
+
+
+def budget_for(route_key: str) -> int:
+    if route_key in settings.QUERY_BUDGETS:
+        return settings.QUERY_BUDGETS[route_key]
+    return ROUTE_QUERY_BUDGETS.get(route_key, settings.QUERY_BUDGET_DEFAULT)
+
+
+def before_query() -> None:
+    """Called from before_cursor_execute. Raises once a budget is crossed when enforcing."""
+    stats = _current.get()
+    while stats is not None:
+        stats.resolve_route()
+        stats.count += 1
+        if settings.QUERY_BUDGET_ENFORCE and stats.budget and stats.count > stats.budget:
+            raise QueryBudgetExceeded(f"{stats.route_key} exceeded its query budget of {stats.budget}")
+        stats = stats.parent
+
+
+def after_query(statement: str, elapsed: float) -> None:
+    stats = _current.get()
+    while stats is not None:
+        stats.db_time += elapsed
+        stats.statements[statement] = stats.statements.get(statement, 0) + 1
+        stats = stats.parent
+
+
+def _report(stats: QueryStats, elapsed: float) -> None:
+    logger.debug(
+        "%s: %d queries, %.1fms DB of %.1fms total",
+        stats.route_key, stats.count, stats.db_time * 1000, elapsed * 1000,
+    )
+    if stats.budget and stats.count > stats.budget:
+        logger.warning("%s ran %d queries (budget %d)", stats.route_key, stats.count, stats.budget)
+    for statement, times in stats.statements.items():
+        if times >= N_PLUS_ONE_THRESHOLD:
+            logger.warning(
+                "Possible N+1 in %s: statement ran %d times: %s",
+                stats.route_key, times, " ".join(statement.split())[:200],
+            )
+
+
+class QueryBudgetMiddleware:
+    """Pure ASGI middleware that scopes a QueryStats to each HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope=scope)
+        stats.parent = _current.get()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            if stats.count:
+                _report(stats, time.perf_counter() - start)
+
+
+@contextmanager
+def count_queries(max_queries: int | None = None):
+    """Count the queries issued inside the block, including those made by
+    requests sent through the app in-process (httpx.ASGITransport), e.g.:
+
+        with count_queries(max_queries=6) as stats:
+            await client.get(f"/users/profile/{user_id}")
+        assert stats.count <= 6
+
+    With QUERY_BUDGET_ENFORCE on, crossing max_queries raises immediately.
+    """
+    stats = QueryStats(route_key="count_queries", budget=max_queries)
+    stats.parent = _current.get()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
@@ -0,0 +1,27 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+from app.config import settings
+
+
+class FastJSONResponse(ORJSONResponse):
+    """orjson-rendered response. Emits UTC datetimes with a trailing "Z" to
+    match what Pydantic produces on the regular response_model path."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+def fast_list(items: list[dict]) -> Any:
+    """Return pre-built row dicts from a list endpoint.
+
+    With FAST_JSON_RESPONSES enabled the dicts are rendered straight to JSON,
+    skipping FastAPI's response_model validation + jsonable_encoder pass.
+    Otherwise they are returned as-is and FastAPI validates them against the
+    route's response_model exactly as before.
+    """
+    if settings.FAST_JSON_RESPONSES:
+        return FastJSONResponse(content=items)
+    return items
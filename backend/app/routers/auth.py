@@ -18,7 +18,7 @@ from app.schemas.auth import (
 )
 from app.schemas.user import UserProfile
 from app.services.auth import hash_password, verify_password, create_access_token, create_refresh_token, decode_token
-from app.services.email import send_verification_email, send_password_reset_email
+from app.services.email import send_verification_email, queue_verification_email, queue_password_reset_email
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -76,7 +76,7 @@ async def signup(request: Request, body: SignUpRequest, db: AsyncSession = Depen
     code = await _create_verification_code(db, user.id, "email_verification")
     await db.commit()
 
-    send_verification_email(email, code)
+    queue_verification_email(email, code)
 
     user_id_str = str(user.id)
     return TokenResponse(
@@ -177,7 +177,7 @@ async def resend_verification(
     code = await _create_verification_code(db, current_user.id, "email_verification")
     await db.commit()
 
-    sent = send_verification_email(current_user.email, code)
+    sent = await send_verification_email(current_user.email, code)
     if not sent:
         raise HTTPException(status_code=500, detail="Failed to send verification email")
 
@@ -198,7 +198,7 @@ async def forgot_password(
     if user:
         code = await _create_verification_code(db, user.id, "password_reset")
         await db.commit()
-        send_password_reset_email(email, code)
+        queue_password_reset_email(email, code)
 
     return {"detail": "If an account with that email exists, a reset code has been sent"}
 
@@ -10,7 +10,7 @@ from app.models.user import User
 from app.models.block import Block
 from app.models.report import Report
 from app.models.friendship import Friendship
-from app.limiter import limiter
+from app.limiter import limiter, user_rate_limit
 from app.schemas.block import BlockCreate, BlockResponse, ReportCreate, ReportResponse
 
 router = APIRouter(prefix="/blocks", tags=["blocks"])
@@ -102,6 +102,7 @@ async def report_user(
     body: ReportCreate,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_verified_user),
+    _: None = Depends(user_rate_limit("report_user", 10, 3600)),
 ):
     if body.reported_user_id == current_user.id:
         raise HTTPException(status_code=400, detail="You cannot report yourself")
@@ -6,13 +6,14 @@ from sqlalchemy import select, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.dependencies import get_verified_user
+from app.dependencies import get_read_db, get_verified_user
 from app.models.user import User
 from app.models.friendship import Friendship
 from app.models.block import Block
 from app.schemas.friendship import FriendRequestCreate, FriendshipResponse, FriendAccept, FriendReject
-from app.limiter import limiter
-from app.services.notifications import send_expo_push
+from app.limiter import limiter, user_rate_limit
+from app.responses import fast_list
+from app.services.notifications import load_device_tokens, send_to_devices
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +22,7 @@ router = APIRouter(prefix="/friends", tags=["friends"])
 
 @router.get("/", response_model=list[FriendshipResponse])
 async def get_friendships(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_verified_user),
 ):
     # Single-query join to fetch friend info (avoids N+1)
@@ -49,18 +50,18 @@ async def get_friendships(
 
     response = []
     for f, other_user in rows:
-        response.append(FriendshipResponse(
-            id=f.id,
-            user_id=f.user_id,
-            friend_id=f.friend_id,
-            status=f.status,
-            created_at=f.created_at,
-            friend_username=other_user.username if other_user else None,
-            friend_profile_picture_url=other_user.profile_picture_url if other_user else None,
-            friend_is_subscribed=other_user.is_subscribed if other_user else False,
-        ))
+        response.append({
+            "id": f.id,
+            "user_id": f.user_id,
+            "friend_id": f.friend_id,
+            "status": f.status,
+            "created_at": f.created_at,
+            "friend_username": other_user.username if other_user else None,
+            "friend_profile_picture_url": other_user.profile_picture_url if other_user else None,
+            "friend_is_subscribed": other_user.is_subscribed if other_user else False,
+        })
 
-    return response
+    return fast_list(response)
 
 
 @router.get("/accepted-ids")
@@ -94,6 +95,7 @@ async def send_friend_request(
     body: FriendRequestCreate,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_verified_user),
+    _: None = Depends(user_rate_limit("send_friend_request", 30, 3600)),
 ):
     if body.friend_id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot friend yourself")
@@ -139,10 +141,11 @@ async def send_friend_request(
     await db.refresh(friendship)
 
     # Send push notification to the recipient
-    if target_user.push_notifications_enabled and target_user.push_token:
+    if target_user.push_notifications_enabled:
         try:
-            await send_expo_push(
-                target_user.push_token,
+            tokens = (await load_device_tokens(db, [target_user.id])).get(target_user.id, [])
+            await send_to_devices(
+                tokens,
                 "👋 New Friend Request",
                 f"{current_user.username} wants to be friends!",
                 {"type": "friend_request", "fromUserId": str(current_user.id), "fromUsername": current_user.username},
@@ -188,10 +191,11 @@ async def accept_friend_request(
     sender = sender_result.scalar_one_or_none()
 
     # Notify the original sender that their request was accepted
-    if sender and sender.push_notifications_enabled and sender.push_token:
+    if sender and sender.push_notifications_enabled:
         try:
-            await send_expo_push(
-                sender.push_token,
+            tokens = (await load_device_tokens(db, [sender.id])).get(sender.id, [])
+            await send_to_devices(
+                tokens,
                 "🎉 Friend Request Accepted",
                 f"{current_user.username} accepted your friend request!",
                 {"type": "friend_accepted", "fromUserId": str(current_user.id), "fromUsername": current_user.username},
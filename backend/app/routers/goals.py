@@ -1,37 +1,71 @@
 import logging
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy import select, func, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
 
 from app.database import get_db
-from app.dependencies import get_verified_user
+from app.dependencies import get_read_db, get_verified_user
 from app.models.user import User
 from app.models.goal import Goal
 from app.models.post import Post
 from app.models.friendship import Friendship
 from app.models.block import Block
 from app.schemas.goal import GoalCreate, GoalResponse
+from app.http_cache import etag_matches, make_etag, not_modified, wants_revalidation, with_etag
+from app.responses import fast_list
 from app.services.storage import delete_file
-from app.services.revenuecat import is_subscribed
+from app.services.revenuecat import entitlements
 
 router = APIRouter(prefix="/goals", tags=["goals"])
 
 MAX_ACTIVE_GOALS_FREE = 2
 
 
+def _goal_to_dict(goal: Goal) -> dict:
+    return {
+        "id": goal.id,
+        "user_id": goal.user_id,
+        "title": goal.title,
+        "description": goal.description,
+        "completed": goal.completed,
+        "archived": goal.archived,
+        "privacy": goal.privacy,
+        "streak_count": goal.streak_count,
+        "streak_interval": goal.streak_interval,
+        "last_posted_at": goal.last_posted_at,
+        "created_at": goal.created_at,
+    }
+
+
 @router.get("/", response_model=list[GoalResponse])
 async def get_user_goals(
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_verified_user),
 ):
+    # Version token: every change to the list either changes the row count
+    # (create/delete) or bumps some goal's updated_at
+    etag = None
+    if wants_revalidation(request):
+        version = await db.execute(
+            select(func.count(), func.max(Goal.updated_at)).where(Goal.user_id == current_user.id)
+        )
+        etag = make_etag(current_user.id, *version.one())
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
     result = await db.execute(
         select(Goal).where(Goal.user_id == current_user.id).order_by(Goal.created_at.desc())
     )
-    return result.scalars().all()
+    goals = result.scalars().all()
+    if etag is None:
+        etag = make_etag(current_user.id, len(goals), max((g.updated_at for g in goals), default=None))
+    return with_etag(fast_list([_goal_to_dict(g) for g in goals]), response, etag)
 
 
 @router.get("/active", response_model=list[GoalResponse])
@@ -44,7 +78,7 @@ async def get_active_goals(
         .where(Goal.user_id == current_user.id, Goal.completed == False)
         .order_by(Goal.created_at.desc())
     )
-    return result.scalars().all()
+    return fast_list([_goal_to_dict(g) for g in result.scalars().all()])
 
 
 @router.post("/", response_model=GoalResponse, status_code=status.HTTP_201_CREATED)
@@ -145,7 +179,7 @@ async def archive_goal(
     Streakd+ only: mark a goal as archived (completed + preserved).
     The goal and all its posts remain visible in the user's Archived section.
     """
-    subscribed = await is_subscribed(str(current_user.id))
+    subscribed = await entitlements.is_subscribed(db, current_user.id)
     if not subscribed:
         raise HTTPException(
             status_code=403,
@@ -258,4 +292,4 @@ async def get_user_goals_public(
         )
         .order_by(Goal.created_at.desc())
     )
-    return result.scalars().all()
+    return fast_list([_goal_to_dict(g) for g in result.scalars().all()])
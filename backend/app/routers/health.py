@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.health import liveness, readiness
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/ready")
+async def health_ready():
+    result = await readiness.get()
+    return JSONResponse(result, status_code=200 if result["ready"] else 503)
+
+
+@router.get("/live")
+async def health_live():
+    result = await liveness.get()
+    return JSONResponse(result, status_code=200 if result["alive"] else 503)
@@ -12,7 +12,8 @@ from app.database import get_db
 from app.models.goal import Goal
 from app.models.notification import NotificationSettings
 from app.models.user import User
-from app.services.notifications import send_expo_push
+from app.services.notifications import load_device_tokens, prune_stale_devices, send_to_devices
+from app.services.push_feedback import push_feedback
 
 router = APIRouter(prefix="/internal", tags=["internal"])
 
@@ -23,6 +24,43 @@ def verify_secret(x_internal_secret: str = Header(...)):
 
 
 
+def _streak_reminder(goal: Goal, now: datetime) -> str | None:
+    """Where a goal stands in its streak window: "expired", "streak_4hr" or
+    "streak_1hr" when a reminder is due, or None."""
+    # Normalise to UTC
+    last_posted = goal.last_posted_at
+    if last_posted.tzinfo is None:
+        last_posted = last_posted.replace(tzinfo=timezone.utc)
+
+    interval_days = goal.streak_interval or 1
+    expires_at = last_posted + timedelta(days=interval_days)
+    four_hr_warn = expires_at - timedelta(hours=4)
+    one_hr_warn = expires_at - timedelta(hours=1)
+
+    if now >= expires_at:
+        return "expired"
+
+    should_4hr = four_hr_warn <= now < one_hr_warn
+    should_1hr = one_hr_warn <= now < expires_at
+
+    # Dedup: skip if we sent a notification recently
+    if goal.notification_time:
+        last_notif = goal.notification_time
+        if last_notif.tzinfo is None:
+            last_notif = last_notif.replace(tzinfo=timezone.utc)
+        hours_since = (now - last_notif).total_seconds() / 3600
+        if hours_since < 3:
+            should_4hr = False
+        if hours_since < 0.5:
+            should_1hr = False
+
+    if should_4hr:
+        return "streak_4hr"
+    if should_1hr:
+        return "streak_1hr"
+    return None
+
+
 @router.post("/send-streak-notifications")
 async def send_streak_notifications(
     db: AsyncSession = Depends(get_db),
@@ -36,65 +74,43 @@ async def send_streak_notifications(
         .where(Goal.completed == False, Goal.last_posted_at.isnot(None))
     )
     goals = result.scalars().all()
+    device_tokens = await load_device_tokens(db, {goal.user_id for goal in goals})
 
     sent = []
 
     for goal in goals:
         user = goal.user
-        if not user or not user.push_token or not user.push_notifications_enabled:
+        if not user or not device_tokens.get(user.id) or not user.push_notifications_enabled:
             continue
         if not user.notification_settings or not user.notification_settings.streak_reminders:
             continue
 
-        # Normalise to UTC
-        last_posted = goal.last_posted_at
-        if last_posted.tzinfo is None:
-            last_posted = last_posted.replace(tzinfo=timezone.utc)
-
-        interval_days = goal.streak_interval or 1
-        expires_at = last_posted + timedelta(days=interval_days)
-        four_hr_warn = expires_at - timedelta(hours=4)
-        one_hr_warn = expires_at - timedelta(hours=1)
-
-        if now >= expires_at:
+        notif_type = _streak_reminder(goal, now)
+        if notif_type == "expired":
             if goal.streak_count > 0:
                 goal.streak_count = 0
                 await db.commit()
             continue
 
-        should_4hr = four_hr_warn <= now < one_hr_warn
-        should_1hr = one_hr_warn <= now < expires_at
-
-        # Dedup: skip if we sent a notification recently
-        if goal.notification_time:
-            last_notif = goal.notification_time
-            if last_notif.tzinfo is None:
-                last_notif = last_notif.replace(tzinfo=timezone.utc)
-            hours_since = (now - last_notif).total_seconds() / 3600
-            if hours_since < 3:
-                should_4hr = False
-            if hours_since < 0.5:
-                should_1hr = False
-
-        notif_type = title = body = None
-        if should_4hr:
-            notif_type = "streak_4hr"
+        if notif_type == "streak_4hr":
             title = f"⚠️ {goal.title} - 4 Hours Left!"
             body = "Your streak expires in 4 hours. Post now to keep it alive!"
-        elif should_1hr:
-            notif_type = "streak_1hr"
+        elif notif_type == "streak_1hr":
             title = f"🚨 {goal.title} - 1 Hour Left!"
             body = "Last chance! Your streak expires in 1 hour. Don't lose your progress!"
 
         if notif_type:
-            expo_result = await send_expo_push(
-                user.push_token, title, body,
+            expo_result = await send_to_devices(
+                device_tokens[user.id], title, body,
                 {"goalId": str(goal.id), "type": notif_type},
             )
             goal.notification_time = now
             await db.commit()
             sent.append({"goalId": str(goal.id), "type": notif_type, "result": expo_result})
 
+    # Clear tokens reported dead during this sweep before the next one runs
+    await push_feedback.flush()
+
     return {"success": True, "sent": len(sent), "notifications": sent}
 
 
@@ -117,7 +133,8 @@ async def send_instant_notification(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    if not user.push_notifications_enabled or not user.push_token:
+    tokens = (await load_device_tokens(db, [user.id])).get(user.id)
+    if not user.push_notifications_enabled or not tokens:
         return {"success": True, "sent": False, "reason": "notifications_disabled"}
 
     # Check per-type notification settings
@@ -144,5 +161,16 @@ async def send_instant_notification(
     else:
         raise HTTPException(status_code=400, detail=f"Unknown notification type: {body.type}")
 
-    expo_result = await send_expo_push(user.push_token, title, notif_body, dict(body.data))
+    expo_result = await send_to_devices(tokens, title, notif_body, dict(body.data))
     return {"success": True, "sent": True, "result": expo_result}
+
+
+@router.post("/prune-device-tokens")
+async def prune_device_tokens(
+    db: AsyncSession = Depends(get_db),
+    _: str = Depends(verify_secret),
+):
+    """Bulk-delete devices that haven't re-registered in DEVICE_TOKEN_MAX_AGE_DAYS."""
+    removed = await prune_stale_devices(db, settings.DEVICE_TOKEN_MAX_AGE_DAYS)
+    await db.commit()
+    return {"success": True, "removed": removed}
@@ -3,22 +3,25 @@ import logging
 import uuid
 from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, Form, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile, File, Form, status
 from PIL import Image
-from sqlalchemy import select, or_, and_
+from sqlalchemy import select, func, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
 
 from app.database import get_db
-from app.dependencies import get_verified_user
+from app.dependencies import get_read_db, get_verified_user
 from app.models.user import User
 from app.models.goal import Goal
 from app.models.post import Post
 from app.models.friendship import Friendship
 from app.models.block import Block
+from app.models.reaction import Reaction
 from app.schemas.post import PostResponse
-from app.limiter import limiter
+from app.limiter import limiter, user_rate_limit
+from app.http_cache import etag_matches, make_etag, not_modified, wants_revalidation, with_etag
+from app.responses import fast_list
 from app.services.storage import upload_file, delete_file
 
 router = APIRouter(prefix="/posts", tags=["posts"])
@@ -55,30 +58,50 @@ def _process_post_image(data: bytes) -> tuple[bytes, str]:
     return out.getvalue(), "image/jpeg"
 
 
+def _post_to_dict(post: Post, user: User, goal: Goal, user_reaction: str | None = None) -> dict:
+    return {
+        "id": post.id,
+        "user_id": post.user_id,
+        "goal_id": post.goal_id,
+        "image_url": post.image_url,
+        "caption": post.caption,
+        "created_at": post.created_at,
+        "reaction_fire": post.reaction_fire,
+        "reaction_fist": post.reaction_fist,
+        "reaction_party": post.reaction_party,
+        "reaction_heart": post.reaction_heart,
+        "username": user.username if user else None,
+        "profile_picture_url": user.profile_picture_url if user else None,
+        "goal_title": goal.title if goal else None,
+        "goal_privacy": goal.privacy if goal else None,
+        "streak_count": goal.streak_count if goal else None,
+        "post_user_is_subscribed": user.is_subscribed if user else False,
+        "user_reaction": user_reaction,
+    }
+
+
 def _post_to_response(post: Post, user: User, goal: Goal) -> PostResponse:
-    return PostResponse(
-        id=post.id,
-        user_id=post.user_id,
-        goal_id=post.goal_id,
-        image_url=post.image_url,
-        caption=post.caption,
-        created_at=post.created_at,
-        reaction_fire=post.reaction_fire,
-        reaction_fist=post.reaction_fist,
-        reaction_party=post.reaction_party,
-        reaction_heart=post.reaction_heart,
-        username=user.username if user else None,
-        profile_picture_url=user.profile_picture_url if user else None,
-        goal_title=goal.title if goal else None,
-        goal_privacy=goal.privacy if goal else None,
-        streak_count=goal.streak_count if goal else None,
-        post_user_is_subscribed=user.is_subscribed if user else False,
-    )
+    return PostResponse(**_post_to_dict(post, user, goal))
+
+
+def _assemble_feed(rows, viewer_id: uuid.UUID) -> list[dict]:
+    # Filter out private goals from friends (show all own posts).
+    # Also hide posts on archived goals from other users — keeps the feed clean
+    # when a friend archives a goal.
+    result = []
+    for post, user, goal, user_reaction in rows:
+        if post.user_id == viewer_id:
+            result.append(_post_to_dict(post, user, goal, user_reaction))
+        elif goal.privacy != "private" and not goal.archived:
+            result.append(_post_to_dict(post, user, goal, user_reaction))
+    return result
 
 
 @router.get("/feed", response_model=list[PostResponse])
 async def get_feed_posts(
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_verified_user),
 ):
     # Get accepted friend IDs
@@ -119,28 +142,53 @@ async def get_feed_posts(
     # Include self, exclude blocked
     all_ids = list((friend_ids - blocked_ids) | {current_user.id})
 
-    # Posts from last 24 hours
     since = datetime.now(timezone.utc) - timedelta(hours=24)
+    in_feed = (Post.user_id.in_(all_ids), Post.created_at >= since)
+
+    # Version token over the same join as the feed query: the set of authors
+    # (friend/block changes), the post count (new posts, deletes, ageing out
+    # of the window) and max updated_at of the posts (including reaction
+    # counters, so the viewer's own reactions too), their goals and authors.
+    authors = sorted(all_ids)
+    etag = None
+    if wants_revalidation(request):
+        version = await db.execute(
+            select(func.count(), func.max(Post.updated_at), func.max(Goal.updated_at), func.max(User.updated_at))
+            .select_from(Post)
+            .join(User, Post.user_id == User.id)
+            .join(Goal, Post.goal_id == Goal.id)
+            .where(*in_feed)
+        )
+        etag = make_etag(current_user.id, authors, *version.one())
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+    # Posts from last 24 hours, with the viewer's own reaction (at most one
+    # per post, enforced by uq_reaction_per_user_per_post) so the client
+    # doesn't need a second round trip to /reactions/user
     posts_result = await db.execute(
-        select(Post, User, Goal)
+        select(Post, User, Goal, Reaction.react_emoji)
         .join(User, Post.user_id == User.id)
         .join(Goal, Post.goal_id == Goal.id)
-        .where(Post.user_id.in_(all_ids), Post.created_at >= since)
+        .outerjoin(
+            Reaction,
+            and_(Reaction.post_id == Post.id, Reaction.user_id_who_reacted == current_user.id),
+        )
+        .where(*in_feed)
         .order_by(Post.created_at.desc())
     )
     rows = posts_result.all()
+    if etag is None:
+        etag = make_etag(
+            current_user.id,
+            authors,
+            len(rows),
+            max((post.updated_at for post, _, _, _ in rows), default=None),
+            max((goal.updated_at for _, _, goal, _ in rows), default=None),
+            max((user.updated_at for _, user, _, _ in rows), default=None),
+        )
 
-    # Filter out private goals from friends (show all own posts).
-    # Also hide posts on archived goals from other users — keeps the feed clean
-    # when a friend archives a goal.
-    result = []
-    for post, user, goal in rows:
-        if post.user_id == current_user.id:
-            result.append(_post_to_response(post, user, goal))
-        elif goal.privacy != "private" and not goal.archived:
-            result.append(_post_to_response(post, user, goal))
-
-    return result
+    return with_etag(fast_list(_assemble_feed(rows, current_user.id)), response, etag)
 
 
 @router.get("/user", response_model=list[PostResponse])
@@ -155,7 +203,7 @@ async def get_user_posts(
         .where(Post.user_id == current_user.id)
         .order_by(Post.created_at.desc())
     )
-    return [_post_to_response(post, user, goal) for post, user, goal in result.all()]
+    return fast_list([_post_to_dict(post, user, goal) for post, user, goal in result.all()])
 
 
 @router.get("/goal/{goal_id}", response_model=list[PostResponse])
@@ -208,7 +256,7 @@ async def get_goal_posts(
         .where(Post.goal_id == goal_id)
         .order_by(Post.created_at.desc())
     )
-    return [_post_to_response(post, user, goal) for post, user, goal in result.all()]
+    return fast_list([_post_to_dict(post, user, goal) for post, user, goal in result.all()])
 
 
 @router.post("/", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
@@ -220,6 +268,7 @@ async def create_post(
     image: UploadFile | None = File(None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_verified_user),
+    _: None = Depends(user_rate_limit("create_post", 20, 3600)),
 ):
     # Verify goal ownership AND that it's still active
     goal_result = await db.execute(
@@ -7,16 +7,22 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.dependencies import get_verified_user
-from app.models.notification import NotificationSettings
 from app.models.user import User
 from app.models.post import Post
 from app.models.goal import Goal
 from app.models.friendship import Friendship
 from app.models.block import Block
 from app.models.reaction import Reaction
-from app.schemas.reaction import ToggleReactionRequest, ToggleReactionResponse, UserReaction
+from app.schemas.reaction import (
+    MAX_REACTION_LOOKUP,
+    ToggleReactionRequest,
+    ToggleReactionResponse,
+    UserReaction,
+    UserReactionsRequest,
+)
+from app.limiter import user_rate_limit
 from app.services.auth import EMOJI_TO_COLUMN
-from app.services.notifications import send_expo_push
+from app.services.notification_buffer import reaction_notifications
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +34,7 @@ async def toggle_reaction(
     body: ToggleReactionRequest,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_verified_user),
+    _: None = Depends(user_rate_limit("toggle_reaction", 60, 60)),
 ):
     column_name = EMOJI_TO_COLUMN.get(body.react_emoji)
     if not column_name:
@@ -117,28 +124,10 @@ async def toggle_reaction(
     await db.commit()
     await db.refresh(post)
 
-    # Notify the post owner on new reactions (skip if reacting to own post)
+    # Notify the post owner on new reactions (skip if reacting to own post).
+    # Bursts are coalesced into one push per owner by the buffer.
     if is_new_reaction and post.user_id != current_user.id:
-        try:
-            owner_result = await db.execute(
-                select(User).where(User.id == post.user_id)
-            )
-            owner = owner_result.scalar_one_or_none()
-            if owner and owner.push_notifications_enabled and owner.push_token:
-                # Check reactions notification setting
-                ns_result = await db.execute(
-                    select(NotificationSettings).where(NotificationSettings.user_id == owner.id)
-                )
-                ns = ns_result.scalar_one_or_none()
-                if ns is None or ns.reactions:
-                    await send_expo_push(
-                        owner.push_token,
-                        "🔥 New Reaction",
-                        f"{current_user.username} reacted to your post!",
-                        {"type": "reaction", "postId": str(post.id), "fromUsername": current_user.username},
-                    )
-        except Exception as e:
-            logger.warning("Failed to send reaction notification: %s", e)
+        reaction_notifications.add(post.user_id, post.id, current_user.username)
 
     return ToggleReactionResponse(
         reaction_fire=post.reaction_fire,
@@ -149,6 +138,18 @@ async def toggle_reaction(
     )
 
 
+async def _reactions_for(db: AsyncSession, user_id: uuid.UUID, ids: list[uuid.UUID]) -> list[UserReaction]:
+    if not ids:
+        return []
+    result = await db.execute(
+        select(Reaction.post_id, Reaction.react_emoji).where(
+            Reaction.user_id_who_reacted == user_id,
+            Reaction.post_id.in_(set(ids)),
+        )
+    )
+    return [UserReaction(post_id=post_id, react_emoji=emoji) for post_id, emoji in result.all()]
+
+
 @router.get("/user", response_model=list[UserReaction])
 async def get_user_reactions(
     post_ids: str = Query(..., description="Comma-separated post IDs"),
@@ -160,17 +161,21 @@ async def get_user_reactions(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid post ID format")
 
-    if not ids:
-        return []
+    if len(ids) > MAX_REACTION_LOOKUP:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_REACTION_LOOKUP} post IDs per request")
 
-    result = await db.execute(
-        select(Reaction).where(
-            Reaction.user_id_who_reacted == current_user.id,
-            Reaction.post_id.in_(ids),
-        )
-    )
-    reactions = result.scalars().all()
-    return [UserReaction(post_id=r.post_id, react_emoji=r.react_emoji) for r in reactions]
+    return await _reactions_for(db, current_user.id, ids)
+
+
+@router.post("/user/batch", response_model=list[UserReaction])
+async def get_user_reactions_batch(
+    body: UserReactionsRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_verified_user),
+):
+    # Same lookup as GET /user, but the IDs travel in the body so long lists
+    # don't hit URL length limits; the schema caps the list length.
+    return await _reactions_for(db, current_user.id, body.post_ids)
 
 
 @router.get("/post/{post_id}", response_model=list[UserReaction])
@@ -0,0 +1,68 @@
+import asyncio
+import os
+import threading
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.blocking_detector import blocking_detector
+from app.config import settings
+from app.database import engine, pool_stats, replica_engine, replica_pool_stats, replica_router
+from app.profiler import MAX_DURATION_SECONDS, ProfilerBusy, format_collapsed, profiler
+from app.routers.notifications import verify_secret
+from app.services.push_feedback import push_feedback
+
+router = APIRouter(prefix="/internal", tags=["internal"])
+
+
+@router.get("/db-pool")
+async def get_db_pool_stats(_: str = Depends(verify_secret)):
+    """Connection pool metrics for this worker. Each uvicorn worker has its own
+    pool, so poll repeatedly (or per-pid) to see every worker."""
+    stats = {"pid": os.getpid(), **pool_stats.snapshot(engine.sync_engine.pool)}
+    if replica_engine is not None:
+        stats["replica"] = {
+            **replica_router.snapshot(),
+            **replica_pool_stats.snapshot(replica_engine.sync_engine.pool),
+        }
+    return stats
+
+
+@router.get("/loop-blocking")
+async def get_loop_blocking_report(_: str = Depends(verify_secret)):
+    """Event-loop stalls seen by this worker, grouped by handler and blocking
+    location, worst total first. Requires BLOCKING_DETECTOR_ENABLED."""
+    return {
+        "pid": os.getpid(),
+        "enabled": settings.BLOCKING_DETECTOR_ENABLED,
+        "threshold_ms": settings.BLOCKING_THRESHOLD_MS,
+        "stalls": blocking_detector.report(),
+    }
+
+
+@router.get("/push-stats")
+async def get_push_stats(_: str = Depends(verify_secret)):
+    """Push outcomes per provider for this worker since startup, plus dead
+    tokens pruned and still waiting to be pruned."""
+    return {"pid": os.getpid(), **push_feedback.snapshot()}
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile_worker(
+    seconds: float = Query(10.0, gt=0, le=MAX_DURATION_SECONDS),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    all_threads: bool = Query(False, description="Include executor threads, not just the event loop"),
+    _: str = Depends(verify_secret),
+):
+    """Statistically profile this worker for `seconds` and return collapsed
+    stacks (feed into flamegraph.pl or speedscope). Only the worker that
+    receives the request is profiled; one profile runs at a time per worker."""
+    loop_thread = None if all_threads else threading.get_ident()
+    try:
+        stacks, samples = await asyncio.to_thread(profiler.run, seconds, interval_ms / 1000, loop_thread)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(
+        format_collapsed(stacks),
+        headers={"X-Profile-Pid": str(os.getpid()), "X-Profile-Samples": str(samples)},
+    )
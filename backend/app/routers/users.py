@@ -2,13 +2,13 @@ import io
 import logging
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile, File, status
 from PIL import Image
 from sqlalchemy import select, func, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.dependencies import get_verified_user
+from app.dependencies import get_read_db, get_verified_user
 from app.models.user import User
 from app.models.post import Post
 from app.models.goal import Goal
@@ -16,7 +16,10 @@ from app.models.friendship import Friendship
 from app.models.notification import NotificationSettings
 from app.models.block import Block
 from app.schemas.user import UserProfile, UsernameUpdate, NameUpdate, NotificationSettingsSchema, PushTokenUpdate, SubscriptionStatusUpdate
+from app.http_cache import etag_matches, make_etag, not_modified, with_etag
 from app.limiter import limiter
+from app.services.notifications import register_device
+from app.services.revenuecat import entitlements
 from app.services.storage import upload_file, delete_file
 
 logger = logging.getLogger(__name__)
@@ -56,22 +59,21 @@ def _compress_profile_picture(data: bytes) -> bytes:
     return out.getvalue()
 
 
-async def _get_friend_count(db: AsyncSession, user_id: uuid.UUID) -> int:
-    result = await db.execute(
-        select(func.count()).where(
-            and_(
-                Friendship.status == "accepted",
-                or_(Friendship.user_id == user_id, Friendship.friend_id == user_id),
-            )
+def _friend_count_query(user_id: uuid.UUID):
+    return select(func.count()).where(
+        and_(
+            Friendship.status == "accepted",
+            or_(Friendship.user_id == user_id, Friendship.friend_id == user_id),
         )
     )
-    return result.scalar() or 0
 
 
 @router.get("/profile/{user_id}", response_model=UserProfile)
 async def get_user_profile(
     user_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_verified_user),
 ):
     # Block check: don't expose profile to/from blocked users
@@ -87,43 +89,49 @@ async def get_user_profile(
         if block_result.scalar_one_or_none():
             raise HTTPException(status_code=404, detail="User not found")
 
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    friend_count = await _get_friend_count(db, user_id)
-
-    post_count_result = await db.execute(
-        select(func.count()).where(Post.user_id == user_id)
-    )
-    post_count = post_count_result.scalar() or 0
-
-    completed_goals_result = await db.execute(
-        select(func.count()).where(Goal.user_id == user_id, Goal.completed == True)
+    # The counts are part of the version token, so fetch them with the user
+    # row in one statement instead of one query each
+    result = await db.execute(
+        select(
+            User,
+            _friend_count_query(user_id).scalar_subquery(),
+            select(func.count()).where(Post.user_id == user_id).scalar_subquery(),
+            select(func.count()).where(Goal.user_id == user_id, Goal.completed == True).scalar_subquery(),
+        ).where(User.id == user_id)
     )
-    completed_goals_count = completed_goals_result.scalar() or 0
+    row = result.one_or_none()
+    if not row:
+        raise HTTPException(status_code=404, detail="User not found")
+    user, friend_count, post_count, completed_goals_count = row
 
     is_self = user.id == current_user.id
 
-    return UserProfile(
-        id=user.id,
-        username=user.username,
-        name=user.name,
-        email=user.email if is_self else None,
-        profile_picture_url=user.profile_picture_url,
-        created_at=user.created_at,
-        friend_count=friend_count,
-        post_count=post_count,
-        completed_goals_count=completed_goals_count,
-        is_subscribed=user.is_subscribed,
+    etag = make_etag(is_self, user.id, user.updated_at, friend_count, post_count, completed_goals_count)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    return with_etag(
+        UserProfile(
+            id=user.id,
+            username=user.username,
+            name=user.name,
+            email=user.email if is_self else None,
+            profile_picture_url=user.profile_picture_url,
+            created_at=user.created_at,
+            friend_count=friend_count or 0,
+            post_count=post_count or 0,
+            completed_goals_count=completed_goals_count or 0,
+            is_subscribed=user.is_subscribed,
+        ),
+        response,
+        etag,
     )
 
 
 @router.get("/search")
 async def search_users(
     query: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_verified_user),
 ):
     # Get blocked user IDs (both directions)
@@ -290,6 +298,9 @@ async def update_subscription_status(
 ):
     current_user.is_subscribed = body.is_subscribed
     await db.commit()
+    # Client just purchased/restored — verify with RevenueCat in the background
+    entitlements.invalidate(current_user.id)
+    entitlements.schedule_refresh(current_user.id)
     return {"is_subscribed": current_user.is_subscribed}
 
 
@@ -299,6 +310,8 @@ async def update_push_token(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_verified_user),
 ):
+    await register_device(db, current_user.id, body.push_token, body.platform)
+    # Legacy single-token column: most recently registered device
     current_user.push_token = body.push_token
     current_user.push_notifications_enabled = True
     await db.commit()
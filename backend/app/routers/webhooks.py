@@ -0,0 +1,61 @@
+import logging
+import secrets
+import uuid
+
+from fastapi import APIRouter, Header, HTTPException, Request
+
+from app.config import settings
+from app.services.revenuecat import entitlements
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/webhooks", tags=["webhooks"])
+
+
+def _user_ids(event: dict) -> set[uuid.UUID]:
+    """App user IDs named by a RevenueCat event. TRANSFER events move the
+    entitlement between users, so both sides need refreshing."""
+    candidates = [event.get("app_user_id"), event.get("original_app_user_id")]
+    for key in ("aliases", "transferred_from", "transferred_to"):
+        values = event.get(key)
+        if isinstance(values, list):
+            candidates += values
+    user_ids = set()
+    for candidate in candidates:
+        try:
+            user_ids.add(uuid.UUID(str(candidate)))
+        except ValueError:
+            # $RCAnonymousID:... and other non-account IDs
+            continue
+    return user_ids
+
+
+@router.post("/revenuecat")
+async def revenuecat_webhook(request: Request, authorization: str = Header("")):
+    # Compared as bytes: compare_digest rejects non-ASCII str
+    if not settings.REVENUECAT_WEBHOOK_AUTH or not secrets.compare_digest(
+        authorization.encode(), settings.REVENUECAT_WEBHOOK_AUTH.encode()
+    ):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    # 4xx for malformed payloads: RevenueCat retries anything 5xx
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    event = body.get("event") if isinstance(body, dict) else None
+    if not isinstance(event, dict) or not event.get("type"):
+        raise HTTPException(status_code=400, detail="Missing event")
+    if event["type"] == "TEST":
+        return {"ok": True}
+    if not event.get("app_user_id"):
+        raise HTTPException(status_code=400, detail="Missing app_user_id")
+
+    # The event payload isn't trusted as the entitlement state (events can
+    # arrive out of order); drop the cached state and re-fetch it instead.
+    user_ids = _user_ids(event)
+    for user_id in user_ids:
+        entitlements.invalidate(user_id)
+        entitlements.schedule_refresh(user_id)
+    logger.info("RevenueCat %s event for %d user(s)", event.get("type"), len(user_ids))
+    return {"ok": True}
@@ -27,5 +27,7 @@ class PostResponse(BaseModel):
     goal_privacy: str | None = None
     streak_count: int | None = None
     post_user_is_subscribed: bool = False
+    # Viewer's own reaction (feed only; None when not reacted or not loaded)
+    user_reaction: str | None = None
 
     model_config = {"from_attributes": True}
@@ -1,7 +1,10 @@
 import uuid
 from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+# Upper bound on post IDs per reactions lookup (a feed page is well under this)
+MAX_REACTION_LOOKUP = 200
 
 
 class ToggleReactionRequest(BaseModel):
@@ -22,3 +25,7 @@ class UserReaction(BaseModel):
     react_emoji: str
 
     model_config = {"from_attributes": True}
+
+
+class UserReactionsRequest(BaseModel):
+    post_ids: list[uuid.UUID] = Field(..., max_length=MAX_REACTION_LOOKUP)
@@ -1,5 +1,6 @@
 import uuid
 from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel, Field
 
@@ -44,3 +45,4 @@ class NotificationSettingsSchema(BaseModel):
 
 class PushTokenUpdate(BaseModel):
     push_token: str = Field(..., min_length=1, max_length=500)
+    platform: Literal["ios", "android"] | None = None
@@ -1,9 +1,9 @@
 from datetime import datetime, timedelta, timezone
 
 import bcrypt
-from jose import JWTError, jwt
 
 from app.config import settings
+from app.services.jwt_verifier import verifier
 
 EMOJI_TO_COLUMN = {
     "🔥": "reaction_fire",
@@ -23,25 +23,13 @@ def verify_password(plain: str, hashed: str) -> bool:
 
 def create_access_token(user_id: str) -> str:
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    return jwt.encode(
-        {"sub": user_id, "exp": expire, "type": "access"},
-        settings.JWT_SECRET_KEY,
-        algorithm=settings.JWT_ALGORITHM,
-    )
+    return verifier.encode({"sub": user_id, "exp": expire, "type": "access"})
 
 
 def create_refresh_token(user_id: str) -> str:
     expire = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    return jwt.encode(
-        {"sub": user_id, "exp": expire, "type": "refresh"},
-        settings.JWT_SECRET_KEY,
-        algorithm=settings.JWT_ALGORITHM,
-    )
+    return verifier.encode({"sub": user_id, "exp": expire, "type": "refresh"})
 
 
 def decode_token(token: str) -> dict | None:
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        return payload
-    except JWTError:
-        return None
+    return verifier.decode(token)
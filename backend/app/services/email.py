@@ -1,87 +1,173 @@
+import asyncio
 import logging
+import random
+import uuid
 
-import resend
+import httpx
 
 from app.config import settings
+from app.http_clients import clients
+from app.metrics import time_external
+from app.services.email_templates import get_template
 
 logger = logging.getLogger(__name__)
 
-resend.api_key = settings.RESEND_API_KEY
 FROM_EMAIL = settings.EMAIL_FROM
-LOGO_URL = "https://streakd.social/assets/logo.png"
-
-
-def _email_wrapper(content: str) -> str:
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head><meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1.0"></head>
-    <body style="margin: 0; padding: 0; background-color: #111111; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Helvetica, Arial, sans-serif;">
-        <table role="presentation" width="100%" cellspacing="0" cellpadding="0" style="background-color: #111111;">
-            <tr><td align="center" style="padding: 40px 16px;">
-                <table role="presentation" width="100%" cellspacing="0" cellpadding="0" style="max-width: 460px; background-color: #1a1a1a; border-radius: 16px; overflow: hidden;">
-                    <!-- Header -->
-                    <tr><td style="padding: 36px 32px 20px; text-align: center; border-bottom: 1px solid rgba(255,255,255,0.06);">
-                        <img src="{LOGO_URL}" alt="streakd" width="56" height="56" style="display: block; margin: 0 auto 12px;" />
-                        <span style="font-size: 22px; font-weight: 700; color: #FF6B35; letter-spacing: -0.3px;">streakd</span>
-                    </td></tr>
-                    <!-- Body -->
-                    <tr><td style="padding: 32px 32px 36px;">
-                        {content}
-                    </td></tr>
-                    <!-- Footer -->
-                    <tr><td style="padding: 20px 32px; text-align: center; border-top: 1px solid rgba(255,255,255,0.06);">
-                        <span style="font-size: 12px; color: #555;">streakd.social</span>
-                    </td></tr>
-                </table>
-            </td></tr>
-        </table>
-    </body>
-    </html>
-    """
+
+# Resend's /emails/batch accepts at most 100 messages per call
+BATCH_SIZE = 100
 
 
-def send_verification_email(to_email: str, code: str) -> bool:
-    content = f"""
-        <p style="color: #e0e0e0; font-size: 16px; margin: 0 0 6px; font-weight: 600;">verify your email</p>
-        <p style="color: #888; font-size: 14px; margin: 0 0 28px; line-height: 1.5;">enter this code in the app to verify your account.</p>
-        <div style="background: rgba(255,107,53,0.08); border: 1px solid rgba(255,107,53,0.2); border-radius: 12px; padding: 24px; text-align: center; margin: 0 0 24px;">
-            <span style="font-size: 36px; font-weight: 700; letter-spacing: 10px; color: #FF6B35; font-family: 'SF Mono', 'Fira Code', monospace;">{code}</span>
-        </div>
-        <p style="color: #666; font-size: 13px; margin: 0 0 4px;">this code expires in 10 minutes.</p>
-        <p style="color: #555; font-size: 12px; margin: 20px 0 0;">if you didn't create a streakd account, you can ignore this email.</p>
+class EmailSender:
+    """Async Resend client: the shared "resend" HTTP client, at most
+    EMAIL_SEND_CONCURRENCY requests in flight, retries with jittered backoff on
+    429/5xx/network errors, and a bounded queue drained by background workers
+    for fire-and-forget sends (so request handlers don't wait on the provider).
+
+    Every request carries an Idempotency-Key that stays the same across its
+    retries, so a retry after a timeout the provider had in fact accepted
+    doesn't deliver the email twice.
     """
-    try:
-        resend.Emails.send({
-            "from": FROM_EMAIL,
-            "to": [to_email],
-            "subject": "verify your streakd account",
-            "html": _email_wrapper(content),
-        })
-        return True
-    except Exception:
-        logger.exception("Failed to send verification email to %s", to_email)
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, api_key: str, concurrency: int, max_retries: int, queue_size: int):
+        self.api_key = api_key
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.queue_size = queue_size
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [asyncio.get_running_loop().create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """Flush queued emails (up to drain_timeout), then stop the workers."""
+        if self._queue is not None and self._workers:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Email queue not drained on shutdown: %d message(s) dropped", self._queue.qsize())
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    async def _worker(self) -> None:
+        while True:
+            message = await self._queue.get()
+            try:
+                await self.send(message)
+            except Exception:
+                logger.exception("Unexpected error in email worker")
+            finally:
+                self._queue.task_done()
+
+    def enqueue(self, message: dict) -> bool:
+        """Queue a message for background delivery. Returns False if it was dropped."""
+        if not self._workers:
+            self.start()
+        try:
+            self._queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.error("Email queue full — dropping email to %s", message.get("to"))
+            return False
+
+    async def _post(self, path: str, payload, description: str) -> bool:
+        """POST to Resend with retries under one Idempotency-Key. Returns True on success."""
+        client = clients.get("resend")
+        headers = {"Idempotency-Key": str(uuid.uuid4())}
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                with time_external("resend"):
+                    response = await client.post(path, json=payload, headers=headers)
+                if response.status_code < 300:
+                    return True
+                if response.status_code not in self.RETRY_STATUSES:
+                    logger.error("Resend rejected %s: %d %s", description, response.status_code, response.text)
+                    return False
+                retry_after = response.headers.get("retry-after")
+            except httpx.HTTPError as e:
+                logger.warning("Resend request for %s failed (attempt %d): %s", description, attempt + 1, e)
+
+            if attempt < self.max_retries:
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else 0.5 * 2 ** attempt
+                await asyncio.sleep(delay + random.uniform(0, 0.25))
         return False
 
+    async def send(self, message: dict) -> bool:
+        """Send one message now, with retries. Returns True on success."""
+        if not self.api_key:
+            logger.warning("RESEND_API_KEY not configured — not sending email to %s", message.get("to"))
+            return False
 
-def send_password_reset_email(to_email: str, code: str) -> bool:
-    content = f"""
-        <p style="color: #e0e0e0; font-size: 16px; margin: 0 0 6px; font-weight: 600;">reset your password</p>
-        <p style="color: #888; font-size: 14px; margin: 0 0 28px; line-height: 1.5;">enter this code in the app to set a new password.</p>
-        <div style="background: rgba(255,107,53,0.08); border: 1px solid rgba(255,107,53,0.2); border-radius: 12px; padding: 24px; text-align: center; margin: 0 0 24px;">
-            <span style="font-size: 36px; font-weight: 700; letter-spacing: 10px; color: #FF6B35; font-family: 'SF Mono', 'Fira Code', monospace;">{code}</span>
-        </div>
-        <p style="color: #666; font-size: 13px; margin: 0 0 4px;">this code expires in 10 minutes.</p>
-        <p style="color: #555; font-size: 12px; margin: 20px 0 0;">if you didn't request a password reset, you can safely ignore this email. your password won't be changed.</p>
-    """
-    try:
-        resend.Emails.send({
-            "from": FROM_EMAIL,
-            "to": [to_email],
-            "subject": "reset your streakd password",
-            "html": _email_wrapper(content),
-        })
-        return True
-    except Exception:
-        logger.exception("Failed to send password reset email to %s", to_email)
+        if await self._post("/emails", message, f"email to {message.get('to')}"):
+            self.sent += 1
+            return True
+        self.failed += 1
+        logger.error("Failed to send email to %s", message.get("to"))
         return False
+
+    async def send_batch(self, messages: list[dict]) -> int:
+        """Send many messages through /emails/batch, BATCH_SIZE per request.
+        Returns how many were accepted."""
+        if not self.api_key:
+            logger.warning("RESEND_API_KEY not configured — not sending %d email(s)", len(messages))
+            return 0
+
+        accepted = 0
+        for i in range(0, len(messages), BATCH_SIZE):
+            chunk = messages[i:i + BATCH_SIZE]
+            # One Idempotency-Key per chunk: a retried chunk is all-or-nothing
+            if await self._post("/emails/batch", chunk, f"batch of {len(chunk)}"):
+                accepted += len(chunk)
+        self.sent += accepted
+        self.failed += len(messages) - accepted
+        return accepted
+
+
+email_sender = EmailSender(
+    settings.RESEND_API_KEY,
+    concurrency=settings.EMAIL_SEND_CONCURRENCY,
+    max_retries=settings.EMAIL_MAX_RETRIES,
+    queue_size=settings.EMAIL_QUEUE_SIZE,
+)
+
+
+def _message(to_email: str, template_name: str, **values) -> dict:
+    template = get_template(template_name)
+    return {"from": FROM_EMAIL, "to": [to_email], "subject": template.subject, "html": template.render(**values)}
+
+
+def build_batch(template_name: str, rows: list[dict]) -> list[dict]:
+    """Render `template_name` for every row (each with a "to" key plus the
+    template's fields) into messages ready for EmailSender.send_batch."""
+    template = get_template(template_name)
+    bodies = template.render_many(rows)
+    return [
+        {"from": FROM_EMAIL, "to": [row["to"]], "subject": template.subject, "html": body}
+        for row, body in zip(rows, bodies)
+    ]
+
+
+async def send_verification_email(to_email: str, code: str) -> bool:
+    return await email_sender.send(_message(to_email, "verification", code=code))
+
+
+def queue_verification_email(to_email: str, code: str) -> bool:
+    return email_sender.enqueue(_message(to_email, "verification", code=code))
+
+
+def queue_password_reset_email(to_email: str, code: str) -> bool:
+    return email_sender.enqueue(_message(to_email, "password_reset", code=code))
@@ -0,0 +1,131 @@
+"""
+Email template registry.
+
+Templates are compiled once at import: the shared HTML wrapper is rendered
+around each template's body up front, and the result is split at its
+`{placeholder}` fields into a tuple of literal chunks. Rendering is then a
+single join of those chunks with the (HTML-escaped) field values — no string
+formatting or wrapper rebuilding per send. `render_many` reuses the compiled
+template for a whole batch of recipients.
+"""
+
+import html
+from string import Formatter
+
+LOGO_URL = "https://streakd.social/assets/logo.png"
+
+_WRAPPER = """
+    <!DOCTYPE html>
+    <html>
+    <head><meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1.0"></head>
+    <body style="margin: 0; padding: 0; background-color: #111111; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Helvetica, Arial, sans-serif;">
+        <table role="presentation" width="100%" cellspacing="0" cellpadding="0" style="background-color: #111111;">
+            <tr><td align="center" style="padding: 40px 16px;">
+                <table role="presentation" width="100%" cellspacing="0" cellpadding="0" style="max-width: 460px; background-color: #1a1a1a; border-radius: 16px; overflow: hidden;">
+                    <!-- Header -->
+                    <tr><td style="padding: 36px 32px 20px; text-align: center; border-bottom: 1px solid rgba(255,255,255,0.06);">
+                        <img src="{LOGO_URL}" alt="streakd" width="56" height="56" style="display: block; margin: 0 auto 12px;" />
+                        <span style="font-size: 22px; font-weight: 700; color: #FF6B35; letter-spacing: -0.3px;">streakd</span>
+                    </td></tr>
+                    <!-- Body -->
+                    <tr><td style="padding: 32px 32px 36px;">
+                        {CONTENT}
+                    </td></tr>
+                    <!-- Footer -->
+                    <tr><td style="padding: 20px 32px; text-align: center; border-top: 1px solid rgba(255,255,255,0.06);">
+                        <span style="font-size: 12px; color: #555;">streakd.social</span>
+                    </td></tr>
+                </table>
+            </td></tr>
+        </table>
+    </body>
+    </html>
+    """
+
+# Static wrapper, pre-rendered once and split around the body
+WRAPPER_PREFIX, WRAPPER_SUFFIX = _WRAPPER.replace("{LOGO_URL}", LOGO_URL).split("{CONTENT}")
+
+
+def _code_email_body(heading: str, instructions: str, footnote: str) -> str:
+    """Body shared by the one-time-code emails; `{code}` is filled per send."""
+    return f"""
+        <p style="color: #e0e0e0; font-size: 16px; margin: 0 0 6px; font-weight: 600;">{heading}</p>
+        <p style="color: #888; font-size: 14px; margin: 0 0 28px; line-height: 1.5;">{instructions}</p>
+        <div style="background: rgba(255,107,53,0.08); border: 1px solid rgba(255,107,53,0.2); border-radius: 12px; padding: 24px; text-align: center; margin: 0 0 24px;">
+            <span style="font-size: 36px; font-weight: 700; letter-spacing: 10px; color: #FF6B35; font-family: 'SF Mono', 'Fira Code', monospace;">{{code}}</span>
+        </div>
+        <p style="color: #666; font-size: 13px; margin: 0 0 4px;">this code expires in 10 minutes.</p>
+        <p style="color: #555; font-size: 12px; margin: 20px 0 0;">{footnote}</p>
+    """
+
+
+class EmailTemplate:
+    def __init__(self, name: str, subject: str, body: str):
+        self.name = name
+        self.subject = subject
+        literals: list[str] = []
+        fields: list[str] = []
+        pending = WRAPPER_PREFIX
+        for literal, field, _spec, _conv in Formatter().parse(body):
+            pending += literal
+            if field is not None:
+                literals.append(pending)
+                fields.append(field)
+                pending = ""
+        literals.append(pending + WRAPPER_SUFFIX)
+        self._literals = tuple(literals)
+        self.fields = tuple(fields)
+
+    def render(self, **values) -> str:
+        parts = [self._literals[0]]
+        for field, literal in zip(self.fields, self._literals[1:]):
+            parts.append(html.escape(str(values[field])))
+            parts.append(literal)
+        return "".join(parts)
+
+    def render_many(self, rows) -> list[str]:
+        """Render one body per mapping in `rows` (e.g. for a batch email job)."""
+        literals = self._literals
+        fields = self.fields
+        escape = html.escape
+        rendered = []
+        for row in rows:
+            parts = [literals[0]]
+            for i, field in enumerate(fields, 1):
+                parts.append(escape(str(row[field])))
+                parts.append(literals[i])
+            rendered.append("".join(parts))
+        return rendered
+
+
+TEMPLATES: dict[str, EmailTemplate] = {}
+
+
+def register(name: str, subject: str, body: str) -> EmailTemplate:
+    template = EmailTemplate(name, subject, body)
+    TEMPLATES[name] = template
+    return template
+
+
+def get_template(name: str) -> EmailTemplate:
+    return TEMPLATES[name]
+
+
+register(
+    "verification",
+    "verify your streakd account",
+    _code_email_body(
+        "verify your email",
+        "enter this code in the app to verify your account.",
+        "if you didn't create a streakd account, you can ignore this email.",
+    ),
+)
+register(
+    "password_reset",
+    "reset your streakd password",
+    _code_email_body(
+        "reset your password",
+        "enter this code in the app to set a new password.",
+        "if you didn't request a password reset, you can safely ignore this email. your password won't be changed.",
+    ),
+)
@@ -0,0 +1,122 @@
+"""
+JWT signing/verification with a decoded-token LRU in front of the JWT library.
+
+The same access token is replayed on every request a client makes during its
+15-minute lifetime, so the signature only needs verifying once per token per
+worker. Successful decodes are cached by token digest until the token's `exp`.
+
+The backing library is selected by `JWT_BACKEND` ("jose" or "pyjwt"). Both
+produce standard compact JWS tokens, so switching backends does not invalidate
+tokens that are already issued.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+
+import jwt as pyjwt
+from jose import JWTError, jwk
+from jose import jwt as jose_jwt
+
+from app.config import settings
+
+
+class _JoseBackend:
+    name = "jose"
+
+    def __init__(self, secret: str, algorithm: str):
+        self.algorithm = algorithm
+        self._secret = secret
+        # Build the jose Key object once — passing the raw secret makes jose
+        # attempt json.loads() on it and construct a new key on every decode.
+        self._key = jwk.construct(secret, algorithm)
+
+    def encode(self, claims: dict) -> str:
+        return jose_jwt.encode(claims, self._secret, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict | None:
+        try:
+            return jose_jwt.decode(token, self._key, algorithms=[self.algorithm])
+        except JWTError:
+            return None
+
+
+class _PyJWTBackend:
+    name = "pyjwt"
+
+    def __init__(self, secret: str, algorithm: str):
+        self.algorithm = algorithm
+        self._key = secret.encode("utf-8")
+        self._algorithms = [algorithm]
+        self._jwt = pyjwt.PyJWT()
+
+    def encode(self, claims: dict) -> str:
+        return self._jwt.encode(claims, self._key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict | None:
+        try:
+            return self._jwt.decode(token, self._key, algorithms=self._algorithms)
+        except pyjwt.InvalidTokenError:
+            return None
+
+
+_BACKENDS = {
+    "jose": _JoseBackend,
+    "pyjwt": _PyJWTBackend,
+}
+
+
+class TokenVerifier:
+    """Verifies JWTs through a bounded LRU keyed by the token's SHA-256 digest.
+
+    Only successfully verified tokens are cached; each entry is dropped once
+    the token's `exp` passes, so a cache hit never extends a token's lifetime.
+    """
+
+    def __init__(self, secret: str, algorithm: str, backend: str = "jose", max_size: int = 4096):
+        if backend not in _BACKENDS:
+            raise ValueError(f"Unknown JWT backend {backend!r} — expected one of {sorted(_BACKENDS)}")
+        self.backend = _BACKENDS[backend](secret, algorithm)
+        self.max_size = max_size
+        self._cache: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, claims: dict) -> str:
+        return self.backend.encode(claims)
+
+    def decode(self, token: str) -> dict | None:
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        entry = self._cache.get(digest)
+        if entry is not None:
+            payload, expires_at = entry
+            if time.time() < expires_at:
+                self._cache.move_to_end(digest)
+                self.hits += 1
+                return dict(payload)
+            del self._cache[digest]
+
+        self.misses += 1
+        payload = self.backend.decode(token)
+        if payload is None:
+            return None
+
+        exp = payload.get("exp")
+        if self.max_size > 0 and isinstance(exp, (int, float)):
+            self._cache[digest] = (payload, float(exp))
+            if len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return dict(payload)
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+verifier = TokenVerifier(
+    settings.JWT_SECRET_KEY,
+    settings.JWT_ALGORITHM,
+    backend=settings.JWT_BACKEND,
+    max_size=settings.JWT_DECODE_CACHE_SIZE,
+)
@@ -0,0 +1,177 @@
+"""
+Coalescing buffer for reaction notifications.
+
+toggle_reaction only records the event here; no lookups or provider calls
+happen on the request path. Events are grouped per recipient, and
+NOTIFICATION_COALESCE_WINDOW seconds after a recipient's first pending
+reaction they are flushed as a single push ("alex and 12 others reacted to
+your post!"), delivered to each of the recipient's devices. Owners,
+notification settings and device tokens for every due recipient are loaded
+in one batch.
+
+Buffers are per worker, so a burst spread across N workers produces at most
+N pushes per window instead of one. If the batch lookup fails, due events
+are put back and retried once on the next tick before being dropped.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.config import settings
+from app.database import async_session
+from app.models.user import User
+from app.services.notifications import load_device_tokens, send_to_devices
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingReactions:
+    def __init__(self, due_at: float):
+        self.due_at = due_at
+        self.actors: list[str] = []  # distinct usernames, first reactor first
+        self.post_ids: list[uuid.UUID] = []
+        self.count = 0
+        self.retried = False
+
+    def merge(self, newer: "_PendingReactions") -> None:
+        for actor in newer.actors:
+            if actor not in self.actors:
+                self.actors.append(actor)
+        for post_id in newer.post_ids:
+            if post_id not in self.post_ids:
+                self.post_ids.append(post_id)
+        self.count += newer.count
+
+
+def reaction_message(actors: list[str], post_count: int) -> str:
+    target = "your post" if post_count == 1 else f"{post_count} of your posts"
+    if len(actors) == 1:
+        return f"{actors[0]} reacted to {target}!"
+    if len(actors) == 2:
+        return f"{actors[0]} and {actors[1]} reacted to {target}!"
+    return f"{actors[0]} and {len(actors) - 1} others reacted to {target}!"
+
+
+class ReactionNotificationBuffer:
+    def __init__(self, window: float, tick: float = 1.0):
+        self.window = window
+        self.tick = tick
+        self.events = 0
+        self.pushes = 0
+        self.dropped = 0
+        self._pending: dict[uuid.UUID, _PendingReactions] = {}
+        self._task: asyncio.Task | None = None
+
+    def add(self, recipient_id: uuid.UUID, post_id: uuid.UUID, actor_username: str) -> None:
+        pending = self._pending.get(recipient_id)
+        if pending is None:
+            pending = _PendingReactions(time.monotonic() + self.window)
+            self._pending[recipient_id] = pending
+        if actor_username not in pending.actors:
+            pending.actors.append(actor_username)
+        if post_id not in pending.post_ids:
+            pending.post_ids.append(post_id)
+        pending.count += 1
+        self.events += 1
+        if self._task is None or self._task.done():
+            self.start()
+
+    async def flush(self, everything: bool = False) -> int:
+        """Send one push per recipient whose window has closed. Returns pushes sent."""
+        now = time.monotonic()
+        due = {
+            recipient_id: pending for recipient_id, pending in self._pending.items()
+            if everything or pending.due_at <= now
+        }
+        if not due:
+            return 0
+        for recipient_id in due:
+            del self._pending[recipient_id]
+
+        try:
+            async with async_session() as db:
+                result = await db.execute(
+                    select(User)
+                    .options(selectinload(User.notification_settings))
+                    .where(User.id.in_(list(due)))
+                )
+                owners = result.scalars().all()
+                device_tokens = await load_device_tokens(db, [owner.id for owner in owners])
+        except Exception:
+            self._requeue(due, retry=not everything)
+            raise
+
+        sent = 0
+        for owner in owners:
+            tokens = device_tokens.get(owner.id)
+            if not owner.push_notifications_enabled or not tokens:
+                continue
+            ns = owner.notification_settings
+            if ns is not None and not ns.reactions:
+                continue
+            pending = due[owner.id]
+            try:
+                await send_to_devices(
+                    tokens,
+                    "🔥 New Reaction" if pending.count == 1 else "🔥 New Reactions",
+                    reaction_message(pending.actors, len(pending.post_ids)),
+                    {
+                        "type": "reaction",
+                        "postId": str(pending.post_ids[-1]),
+                        "fromUsername": pending.actors[0],
+                        "count": pending.count,
+                    },
+                )
+                sent += 1
+            except Exception as e:
+                logger.warning("Failed to send reaction notification: %s", e)
+        self.pushes += sent
+        return sent
+
+    def _requeue(self, due: dict[uuid.UUID, _PendingReactions], retry: bool) -> None:
+        """Put events back after a failed lookup, once; drop what already had its retry."""
+        dropped = 0
+        for recipient_id, pending in due.items():
+            if not retry or pending.retried:
+                dropped += pending.count
+                continue
+            pending.retried = True
+            pending.due_at = time.monotonic()  # retry on the next tick
+            newer = self._pending.get(recipient_id)
+            if newer is not None:
+                # Reactions that arrived during the failed flush
+                pending.merge(newer)
+            self._pending[recipient_id] = pending
+        if dropped:
+            self.dropped += dropped
+            logger.error("Dropped %d reaction notification event(s) after failed lookups", dropped)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush(everything=True)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Reaction notification flush failed")
+
+
+reaction_notifications = ReactionNotificationBuffer(settings.NOTIFICATION_COALESCE_WINDOW)
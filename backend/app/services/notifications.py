@@ -1,11 +1,21 @@
+import asyncio
 import json
 import logging
 import time
+import uuid
+from datetime import datetime, timedelta, timezone
 
-import httpx
 import jwt
+from cryptography.hazmat.primitives import serialization
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
+from app.http_clients import clients
+from app.metrics import time_external
+from app.models.device_token import DeviceToken
+from app.services.push_feedback import FAILED, SKIPPED, classify_apns, classify_expo, push_feedback
 
 logger = logging.getLogger(__name__)
 
@@ -26,31 +36,89 @@ async def send_push_notification(token: str, title: str, body: str, data: dict)
     device token and routes accordingly. This allows both the React Native
     (Expo) and native Swift apps to coexist during migration.
     """
-    if _is_expo_token(token):
-        return await _send_expo_push(token, title, body, data)
-    else:
-        return await _send_apns_push(token, title, body, data)
+    provider, send, classify = (
+        ("expo", _send_expo_push, classify_expo) if _is_expo_token(token)
+        else ("apns", _send_apns_push, classify_apns)
+    )
+    if push_feedback.is_dead(token):
+        # Already reported dead and waiting to be pruned — don't resend
+        push_feedback.record(provider, token, SKIPPED)
+        return {"error": "dead_token", "skipped": True}
+    try:
+        result = await send(token, title, body, data)
+    except Exception:
+        push_feedback.record(provider, token, FAILED)
+        raise
+    push_feedback.record(provider, token, classify(result))
+    return result
 
 
 # Keep the old name as an alias so existing callers don't break
 send_expo_push = send_push_notification
 
 
+# ============================================================
+# Multi-device registry and fan-out
+# ============================================================
+
+async def register_device(db: AsyncSession, user_id: uuid.UUID, token: str, platform: str | None) -> None:
+    """Add or refresh a device for the user. A token belongs to one app install,
+    so it is detached from any other account it was registered to."""
+    now = datetime.now(timezone.utc)
+    await db.execute(delete(DeviceToken).where(DeviceToken.token == token, DeviceToken.user_id != user_id))
+    stmt = insert(DeviceToken).values(user_id=user_id, token=token, platform=platform, last_seen_at=now, created_at=now)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[DeviceToken.user_id, DeviceToken.token],
+        set_={"last_seen_at": now, "platform": func.coalesce(stmt.excluded.platform, DeviceToken.platform)},
+    ))
+
+
+async def load_device_tokens(db: AsyncSession, user_ids) -> dict[uuid.UUID, list[str]]:
+    """All registered device tokens for the given users, in one query."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+    result = await db.execute(
+        select(DeviceToken.user_id, DeviceToken.token).where(DeviceToken.user_id.in_(user_ids))
+    )
+    tokens: dict[uuid.UUID, list[str]] = {}
+    for user_id, token in result.all():
+        tokens.setdefault(user_id, []).append(token)
+    return tokens
+
+
+async def send_to_devices(tokens: list[str], title: str, body: str, data: dict) -> list[dict]:
+    """Send to every device concurrently (Expo or APNs per token). One failing
+    device doesn't affect the others; its entry carries the error instead."""
+    results = await asyncio.gather(
+        *(send_push_notification(token, title, body, data) for token in tokens),
+        return_exceptions=True,
+    )
+    return [
+        {"error": str(result)} if isinstance(result, Exception) else result
+        for result in results
+    ]
+
+
+async def prune_stale_devices(db: AsyncSession, max_age_days: int) -> int:
+    """Delete devices that haven't re-registered within max_age_days. Returns rows removed."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+    result = await db.execute(delete(DeviceToken).where(DeviceToken.last_seen_at < cutoff))
+    return result.rowcount
+
+
 # ============================================================
 # Expo Push (legacy — for React Native app)
 # ============================================================
 
 async def _send_expo_push(token: str, title: str, body: str, data: dict) -> dict:
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json",
-    }
+    headers = {}
     if settings.EXPO_ACCESS_TOKEN:
         headers["Authorization"] = f"Bearer {settings.EXPO_ACCESS_TOKEN}"
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            "https://exp.host/--/api/v2/push/send",
+    with time_external("expo"):
+        response = await clients.get("expo").post(
+            "/--/api/v2/push/send",
             json={
                 "to": token,
                 "sound": "default",
@@ -60,51 +128,97 @@ async def _send_expo_push(token: str, title: str, body: str, data: dict) -> dict
                 "priority": "high",
             },
             headers=headers,
-            timeout=10.0,
         )
-        return response.json()
+    return response.json()
 
 
 # ============================================================
 # APNs Push (native iOS)
 # ============================================================
 
-def _build_apns_jwt() -> str:
-    """Build a short-lived JWT for APNs token-based authentication.
+class APNsTokenManager:
+    """Provider-token (JWT) manager for APNs token-based authentication.
 
     Requires these settings:
       APNS_KEY_ID      — 10-char key ID from Apple Developer
       APNS_TEAM_ID     — 10-char team ID
       APNS_KEY_PATH    — path to the .p8 private key file
+
+    The .p8 key is read and parsed once into an EC key object. Tokens are
+    valid for an hour, but APNs rejects updates more often than every 20
+    minutes, so a token is used for TOKEN_LIFETIME and a background task
+    re-signs it REFRESH_AHEAD before then. Senders only ever read the cached
+    token; if it has lapsed (e.g. no background task running), the caller
+    re-signs it. Signing is synchronous, so concurrent callers can't
+    interleave and the first one's token is reused by the rest.
     """
-    with open(settings.APNS_KEY_PATH, "r") as f:
-        private_key = f.read()
 
-    now = int(time.time())
-    payload = {
-        "iss": settings.APNS_TEAM_ID,
-        "iat": now,
-    }
-    headers = {
-        "alg": "ES256",
-        "kid": settings.APNS_KEY_ID,
-    }
-    return jwt.encode(payload, private_key, algorithm="ES256", headers=headers)
+    TOKEN_LIFETIME = 3000  # 50 minutes
+    REFRESH_AHEAD = 300
+    RETRY_DELAY = 60.0  # after a failed background refresh (e.g. unreadable key)
+
+    def __init__(self):
+        self._signing_key = None
+        self._token: str | None = None
+        self._expires_at = 0.0
+        self._refresher: asyncio.Task | None = None
+
+    def _load_key(self):
+        if self._signing_key is None:
+            with open(settings.APNS_KEY_PATH, "rb") as f:
+                self._signing_key = serialization.load_pem_private_key(f.read(), password=None)
+        return self._signing_key
+
+    def _sign(self) -> None:
+        now = time.time()
+        self._token = jwt.encode(
+            {"iss": settings.APNS_TEAM_ID, "iat": int(now)},
+            self._load_key(),
+            algorithm="ES256",
+            headers={"alg": "ES256", "kid": settings.APNS_KEY_ID},
+        )
+        self._expires_at = now + self.TOKEN_LIFETIME
+
+    async def get_token(self) -> str:
+        if self._token is None or time.time() >= self._expires_at:
+            self._sign()
+        self.start()
+        return self._token
 
+    def invalidate(self) -> None:
+        """Drop the current token, e.g. after APNs answers ExpiredProviderToken."""
+        self._expires_at = 0.0
 
-# Cache the JWT for ~50 minutes (APNs tokens are valid for 1 hour)
-_apns_jwt_cache: dict = {"token": None, "expires_at": 0}
+    def start(self) -> None:
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.get_running_loop().create_task(self._refresh_loop())
 
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
 
-def _get_apns_jwt() -> str:
-    now = int(time.time())
-    if _apns_jwt_cache["token"] and now < _apns_jwt_cache["expires_at"]:
-        return _apns_jwt_cache["token"]
+    async def _refresh_loop(self) -> None:
+        delay = max(self._expires_at - self.REFRESH_AHEAD - time.time(), 1.0)
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                self._sign()
+                delay = self.TOKEN_LIFETIME - self.REFRESH_AHEAD
+            except Exception:
+                logger.exception("APNs provider token refresh failed")
+                delay = self.RETRY_DELAY
 
-    token = _build_apns_jwt()
-    _apns_jwt_cache["token"] = token
-    _apns_jwt_cache["expires_at"] = now + 3000  # 50 minutes
-    return token
+
+apns_tokens = APNsTokenManager()
+
+
+def apns_configured() -> bool:
+    return bool(settings.APNS_KEY_PATH and settings.APNS_KEY_ID and settings.APNS_TEAM_ID)
 
 
 async def _send_apns_push(device_token: str, title: str, body: str, data: dict) -> dict:
@@ -112,20 +226,14 @@ async def _send_apns_push(device_token: str, title: str, body: str, data: dict)
 
     Uses token-based authentication (.p8 key).
     """
-    if not settings.APNS_KEY_PATH or not settings.APNS_KEY_ID or not settings.APNS_TEAM_ID:
+    if not apns_configured():
         logger.warning("APNs not configured — skipping push to device token %s...", device_token[:8])
         return {"error": "APNs not configured"}
 
-    apns_jwt = _get_apns_jwt()
+    apns_jwt = await apns_tokens.get_token()
 
-    # Use production APNs by default; set APNS_USE_SANDBOX=true for development
-    host = (
-        "https://api.sandbox.push.apple.com"
-        if settings.APNS_USE_SANDBOX
-        else "https://api.push.apple.com"
-    )
-
-    url = f"{host}/3/device/{device_token}"
+    # Production vs sandbox host (APNS_USE_SANDBOX) is set on the "apns" client
+    url = f"/3/device/{device_token}"
 
     apns_payload = {
         "aps": {
@@ -148,23 +256,24 @@ async def _send_apns_push(device_token: str, title: str, body: str, data: dict)
     }
 
     try:
-        async with httpx.AsyncClient(http2=True) as client:
-            response = await client.post(
+        with time_external("apns"):
+            response = await clients.get("apns").post(
                 url,
                 content=json.dumps(apns_payload),
                 headers=headers,
-                timeout=10.0,
             )
 
-            if response.status_code == 200:
-                return {"success": True}
-            else:
-                error_body = response.text
-                logger.error(
-                    "APNs error %d for token %s...: %s",
-                    response.status_code, device_token[:8], error_body,
-                )
-                return {"error": error_body, "status": response.status_code}
+        if response.status_code == 200:
+            return {"success": True}
+        else:
+            error_body = response.text
+            if response.status_code == 403 and "ExpiredProviderToken" in error_body:
+                apns_tokens.invalidate()
+            logger.error(
+                "APNs error %d for token %s...: %s",
+                response.status_code, device_token[:8], error_body,
+            )
+            return {"error": error_body, "status": response.status_code}
 
     except Exception as e:
         logger.error("APNs request failed: %s", e)
@@ -0,0 +1,145 @@
+"""
+Push delivery feedback.
+
+Every push result is classified per provider. Tokens the provider reports as
+permanently dead are queued and removed from device_tokens (and cleared from
+the legacy users.push_token) in batched statements, either by the periodic
+flush or at the end of the streak sweep. Until that flush lands, sends to a
+queued token are skipped rather than retried.
+
+Only the immediate response is inspected: APNs status/reason, and the Expo
+push ticket. Expo push receipts, which can report DeviceNotRegistered later,
+are not polled.
+"""
+
+import asyncio
+import json
+import logging
+from collections import Counter
+
+from sqlalchemy import delete, update
+
+from app.config import settings
+from app.database import async_session
+from app.models.device_token import DeviceToken
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# APNs reasons meaning the token will never work again for this app
+APNS_DEAD_REASONS = {"BadDeviceToken", "Unregistered", "DeviceTokenNotForTopic"}
+EXPO_DEAD_ERRORS = {"DeviceNotRegistered"}
+
+DELIVERED = "delivered"
+DEAD_TOKEN = "dead_token"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+def classify_apns(result: dict) -> str:
+    if result.get("success"):
+        return DELIVERED
+    if result.get("status") == 410:
+        return DEAD_TOKEN
+    try:
+        reason = json.loads(result.get("error") or "{}").get("reason")
+    except (ValueError, AttributeError):
+        reason = None
+    return DEAD_TOKEN if reason in APNS_DEAD_REASONS else FAILED
+
+
+def classify_expo(result: dict) -> str:
+    ticket = result.get("data")
+    if isinstance(ticket, list):
+        ticket = ticket[0] if ticket else {}
+    if not isinstance(ticket, dict):
+        return FAILED
+    if ticket.get("status") == "ok":
+        return DELIVERED
+    error = (ticket.get("details") or {}).get("error")
+    return DEAD_TOKEN if error in EXPO_DEAD_ERRORS else FAILED
+
+
+class PushFeedback:
+    # Tokens held while flushes keep failing (e.g. DB down); the oldest are
+    # dropped past this. A dropped token is simply rediscovered on its next send.
+    MAX_PENDING = 50_000
+
+    def __init__(self, flush_interval: float, batch_size: int = 500):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.stats: dict[str, Counter] = {}
+        self.pruned = 0
+        self.overflowed = 0
+        # Insertion-ordered set, so overflow evicts the oldest tokens
+        self._dead: dict[str, None] = {}
+        self._task: asyncio.Task | None = None
+
+    def is_dead(self, token: str) -> bool:
+        return token in self._dead
+
+    def record(self, provider: str, token: str, outcome: str) -> None:
+        self.stats.setdefault(provider, Counter())[outcome] += 1
+        if outcome == DEAD_TOKEN and token not in self._dead:
+            self._dead[token] = None
+            if len(self._dead) > self.MAX_PENDING:
+                del self._dead[next(iter(self._dead))]
+                if not self.overflowed:
+                    logger.warning("Dead push token queue full (%d); dropping the oldest", self.MAX_PENDING)
+                self.overflowed += 1
+
+    async def flush(self) -> int:
+        """Remove every queued dead token. Returns devices removed."""
+        if not self._dead:
+            return 0
+        tokens = list(self._dead)
+        cleared = 0
+        try:
+            async with async_session() as db:
+                for i in range(0, len(tokens), self.batch_size):
+                    batch = tokens[i:i + self.batch_size]
+                    result = await db.execute(delete(DeviceToken).where(DeviceToken.token.in_(batch)))
+                    cleared += result.rowcount
+                    await db.execute(update(User).where(User.push_token.in_(batch)).values(push_token=None))
+                await db.commit()
+        except Exception:
+            logger.exception("Failed to prune %d dead push token(s)", len(tokens))
+            return 0
+        for token in tokens:
+            self._dead.pop(token, None)
+        self.pruned += cleared
+        if self.overflowed:
+            logger.warning("%d dead push token(s) were dropped unpruned while the queue was full", self.overflowed)
+            self.overflowed = 0
+        logger.info("Pruned %d dead push token(s)", cleared)
+        return cleared
+
+    def snapshot(self) -> dict:
+        return {
+            "providers": {provider: dict(counts) for provider, counts in self.stats.items()},
+            "pending_prune": len(self._dead),
+            "dropped_unpruned": self.overflowed,
+            "pruned": self.pruned,
+        }
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+
+push_feedback = PushFeedback(settings.PUSH_FEEDBACK_FLUSH_INTERVAL)
@@ -1,52 +1,201 @@
 """
 RevenueCat server-side subscription verification.
 Used only for the archive endpoint — goal creation uses client-side enforcement.
+
+Entitlements are never fetched on the request path. The last known state is
+stored per user in the `entitlements` table (expiry taken from RevenueCat's
+`expires_date`) and served from an in-memory TTL cache in front of it.
+Entitlements are re-fetched in the background:
+  - when the RevenueCat webhook reports a change for the user,
+  - when the client reports a purchase/restore (PUT /users/subscription-status),
+  - by a sweep that refreshes entitlements shortly before they expire,
+  - when a lookup finds a stale or an expired row.
+A lookup that finds no row at all (a new subscriber, or one whose state
+predates the table) falls back to the client-reported users.is_subscribed
+while a background refresh creates the row for the next lookup.
+
+The memory cache is per worker, so a webhook invalidates it only on the
+worker that received it; other workers pick up the new DB state within
+ENTITLEMENT_CACHE_TTL.
 """
 
-from datetime import datetime, timezone
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
 
-import httpx
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
+from app.database import async_session
+from app.http_clients import clients
+from app.metrics import time_external
+from app.models.entitlement import Entitlement
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
 
-REVENUECAT_API_BASE = "https://api.revenuecat.com/v1"
 # Must match the entitlement identifier in the RevenueCat dashboard exactly
 STREAKD_PLUS_ENTITLEMENT = "streakd+"
 
 
-async def is_subscribed(app_user_id: str) -> bool:
-    """Return True if the user has an active streakd_plus entitlement."""
-    if not settings.REVENUECAT_API_KEY:
-        return False
+def _parse_entitlement(data: dict) -> tuple[bool, datetime | None]:
+    entitlements = data.get("subscriber", {}).get("entitlements", {})
+    entitlement = entitlements.get(STREAKD_PLUS_ENTITLEMENT)
+    if not entitlement:
+        return False, None
 
-    url = f"{REVENUECAT_API_BASE}/subscribers/{app_user_id}"
-    headers = {
-        "Authorization": f"Bearer {settings.REVENUECAT_API_KEY}",
-        "Content-Type": "application/json",
-    }
+    expires_date_str = entitlement.get("expires_date")
 
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(url, headers=headers)
+    # Null expires_date means a lifetime entitlement — always active
+    if expires_date_str is None:
+        return True, None
+
+    # Otherwise check if the expiry is still in the future
+    expires_date = datetime.fromisoformat(expires_date_str.replace("Z", "+00:00"))
+    return expires_date > datetime.now(timezone.utc), expires_date
 
+
+async def fetch_entitlement(app_user_id: str) -> tuple[bool, datetime | None] | None:
+    """Ask RevenueCat for the user's streakd+ entitlement.
+    Returns (active, expires_at), or None if unknown (RevenueCat not configured
+    or couldn't be reached)."""
+    if not settings.REVENUECAT_API_KEY:
+        return None
+
+    try:
+        with time_external("revenuecat"):
+            response = await clients.get("revenuecat").get(f"/subscribers/{app_user_id}")
         if response.status_code != 200:
-            return False
+            logger.warning("RevenueCat lookup for %s failed: %d", app_user_id, response.status_code)
+            return None
+        return _parse_entitlement(response.json())
+    except Exception:
+        logger.exception("RevenueCat lookup for %s failed", app_user_id)
+        return None
 
-        data = response.json()
-        entitlements = data.get("subscriber", {}).get("entitlements", {})
-        entitlement = entitlements.get(STREAKD_PLUS_ENTITLEMENT)
-        if not entitlement:
-            return False
 
-        expires_date_str = entitlement.get("expires_date")
+class EntitlementCache:
+    def __init__(self, ttl: float, max_age: float, refresh_ahead: float, sweep_interval: float):
+        self.ttl = ttl
+        self.max_age = timedelta(seconds=max_age)
+        self.refresh_ahead = timedelta(seconds=refresh_ahead)
+        self.sweep_interval = sweep_interval
+        # user_id -> (active, expires_at, cached_until monotonic)
+        self._cache: dict[uuid.UUID, tuple[bool, datetime | None, float]] = {}
+        self._refreshing: dict[uuid.UUID, asyncio.Task] = {}
+        self._sweeper: asyncio.Task | None = None
 
-        # Null expires_date means a lifetime entitlement — always active
-        if expires_date_str is None:
-            return True
+    def _remember(self, user_id: uuid.UUID, active: bool, expires_at: datetime | None) -> None:
+        cached_until = time.monotonic() + self.ttl
+        if expires_at is not None:
+            # Never serve an entitlement from memory past its expiry
+            remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+            cached_until = min(cached_until, time.monotonic() + max(remaining, 0.0))
+        self._cache[user_id] = (active, expires_at, cached_until)
 
-        # Otherwise check if the expiry is still in the future
-        expires_date = datetime.fromisoformat(expires_date_str.replace("Z", "+00:00"))
-        return expires_date > datetime.now(timezone.utc)
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        self._cache.pop(user_id, None)
 
-    except Exception:
-        return False
+    async def is_subscribed(self, db: AsyncSession, user_id: uuid.UUID) -> bool:
+        """Current entitlement from memory or the DB; never calls RevenueCat inline."""
+        entry = self._cache.get(user_id)
+        if entry is not None and time.monotonic() < entry[2]:
+            return entry[0]
+
+        row = await db.get(Entitlement, user_id)
+        if row is None:
+            # No stored state yet: trust the client-reported flag for this
+            # request rather than locking the user out; the refresh stores the
+            # row for the next lookup
+            self.schedule_refresh(user_id)
+            return bool(await db.scalar(select(User.is_subscribed).where(User.id == user_id)))
+
+        now = datetime.now(timezone.utc)
+        active = row.active and (row.expires_at is None or row.expires_at > now)
+        if now - row.refreshed_at > self.max_age or (row.active and not active):
+            # Stale, or lapsed since the last check (a renewal may be pending)
+            self.schedule_refresh(user_id)
+        self._remember(user_id, active, row.expires_at)
+        return active
+
+    def schedule_refresh(self, user_id: uuid.UUID) -> asyncio.Task:
+        """Re-fetch from RevenueCat in the background; one refresh per user at a time.
+        Returns the (possibly already running) refresh task."""
+        task = self._refreshing.get(user_id)
+        if task is not None and not task.done():
+            return task
+        task = asyncio.get_running_loop().create_task(self.refresh(user_id))
+        self._refreshing[user_id] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(user_id, None))
+        return task
+
+    async def refresh(self, user_id: uuid.UUID) -> bool | None:
+        """Fetch and store the user's entitlement. Returns None, writing nothing,
+        when the state is unknown."""
+        result = await fetch_entitlement(str(user_id))
+        if result is None:
+            return None
+        active, expires_at = result
+        now = datetime.now(timezone.utc)
+        async with async_session() as db:
+            stmt = insert(Entitlement).values(
+                user_id=user_id, active=active, expires_at=expires_at, refreshed_at=now,
+            )
+            await db.execute(stmt.on_conflict_do_update(
+                index_elements=[Entitlement.user_id],
+                set_={"active": active, "expires_at": expires_at, "refreshed_at": now},
+            ))
+            # Keep the displayed badge in line with the verified state
+            await db.execute(update(User).where(User.id == user_id).values(is_subscribed=active))
+            await db.commit()
+        self._remember(user_id, active, expires_at)
+        return active
+
+    def start(self) -> None:
+        if settings.REVENUECAT_API_KEY and (self._sweeper is None or self._sweeper.done()):
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep())
+
+    async def stop(self) -> None:
+        tasks = list(self._refreshing.values())
+        if self._sweeper is not None:
+            tasks.append(self._sweeper)
+            self._sweeper = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _sweep(self) -> None:
+        """Refresh active entitlements that expire within ENTITLEMENT_REFRESH_AHEAD,
+        so renewals are picked up before the old expiry is reached."""
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                now = datetime.now(timezone.utc)
+                async with async_session() as db:
+                    result = await db.execute(
+                        select(Entitlement.user_id)
+                        .where(
+                            Entitlement.active == True,
+                            Entitlement.expires_at.isnot(None),
+                            Entitlement.expires_at < now + self.refresh_ahead,
+                            Entitlement.refreshed_at < now - timedelta(seconds=self.sweep_interval),
+                        )
+                        .limit(100)
+                    )
+                    user_ids = result.scalars().all()
+                for user_id in user_ids:
+                    await self.refresh(user_id)
+            except Exception:
+                logger.exception("Entitlement refresh sweep failed")
+
+
+entitlements = EntitlementCache(
+    ttl=settings.ENTITLEMENT_CACHE_TTL,
+    max_age=settings.ENTITLEMENT_MAX_AGE,
+    refresh_ahead=settings.ENTITLEMENT_REFRESH_AHEAD,
+    sweep_interval=settings.ENTITLEMENT_SWEEP_INTERVAL,
+)
@@ -5,6 +5,7 @@ import uuid
 import boto3
 
 from app.config import settings
+from app.metrics import time_external
 
 logger = logging.getLogger(__name__)
 
@@ -12,7 +13,7 @@ logger = logging.getLogger(__name__)
 def _get_s3_client():
     return boto3.client(
         "s3",
-        endpoint_url=f"https://{settings.R2_ACCOUNT_ID}.r2.cloudflarestorage.com",
+        endpoint_url=settings.R2_ENDPOINT_URL or f"https://{settings.R2_ACCOUNT_ID}.r2.cloudflarestorage.com",
         aws_access_key_id=settings.R2_ACCESS_KEY_ID,
         aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
         region_name="auto",
@@ -32,7 +33,8 @@ async def upload_file(file_bytes: bytes, content_type: str, folder: str = "uploa
             ContentType=content_type,
         )
 
-    await asyncio.to_thread(_upload)
+    with time_external("r2"):
+        await asyncio.to_thread(_upload)
     return f"{settings.R2_PUBLIC_URL}/{key}"
 
 
@@ -54,4 +56,5 @@ async def delete_file(url: str) -> None:
         client = _get_s3_client()
         client.delete_object(Bucket=settings.R2_BUCKET_NAME, Key=key)
 
-    await asyncio.to_thread(_delete)
+    with time_external("r2"):
+        await asyncio.to_thread(_delete)
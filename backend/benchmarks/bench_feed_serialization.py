@@ -0,0 +1,81 @@
+"""
+Benchmark: per-request CPU for a 500-item feed.
+
+Compares the response_model path (PostResponse per row, then FastAPI
+re-validates and serializes) against the fast path (row dicts rendered
+directly with orjson). Both routes run in-process through httpx's ASGI
+transport. Run from backend/:
+
+    python -m benchmarks.bench_feed_serialization
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+
+from app.responses import FastJSONResponse
+from app.routers.posts import _post_to_dict, _post_to_response
+from app.schemas.post import PostResponse
+
+FEED_SIZE = 500
+REQUESTS = 200
+
+
+def _fake_rows(n: int) -> list[tuple]:
+    rows = []
+    now = datetime.now(timezone.utc)
+    for i in range(n):
+        user = SimpleNamespace(
+            username=f"user{i}", profile_picture_url=f"https://cdn.example/p/{i}.jpg", is_subscribed=i % 3 == 0,
+        )
+        goal = SimpleNamespace(title=f"goal {i}", privacy="friends", streak_count=i % 40)
+        post = SimpleNamespace(
+            id=uuid.uuid4(), user_id=uuid.uuid4(), goal_id=uuid.uuid4(),
+            image_url=f"https://cdn.example/posts/{i}.jpg", caption="day " * 8, created_at=now,
+            reaction_fire=i, reaction_fist=i // 2, reaction_party=i // 3, reaction_heart=i // 4,
+        )
+        rows.append((post, user, goal))
+    return rows
+
+
+def _build_app(rows: list[tuple]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/validated", response_model=list[PostResponse])
+    async def validated():
+        return [_post_to_response(p, u, g) for p, u, g in rows]
+
+    @app.get("/fast", response_model=list[PostResponse])
+    async def fast():
+        return FastJSONResponse(content=[_post_to_dict(p, u, g) for p, u, g in rows])
+
+    return app
+
+
+async def _measure(client: httpx.AsyncClient, path: str) -> float:
+    await client.get(path)  # warm-up
+    start = time.process_time()
+    for _ in range(REQUESTS):
+        response = await client.get(path)
+        response.raise_for_status()
+    return (time.process_time() - start) / REQUESTS * 1000
+
+
+async def main() -> None:
+    app = _build_app(_fake_rows(FEED_SIZE))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        validated = await _measure(client, "/validated")
+        fast = await _measure(client, "/fast")
+    print(f"{FEED_SIZE}-item feed, CPU per request")
+    print(f"  response_model path: {validated:8.2f} ms")
+    print(f"  orjson fast path:    {fast:8.2f} ms  ({validated / fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""
+Benchmark: per-call overhead of a client-per-call vs the shared registry client.
+
+Starts a minimal keep-alive HTTP/1.1 server on localhost and times N sequential
+POSTs made the old way (a new httpx.AsyncClient per call, as the push and
+RevenueCat services used to do) and through `app.http_clients.clients`. Over
+loopback this isolates client construction and TCP connect; against the real
+services each fresh client also pays DNS and a TLS handshake, so production
+savings are larger.
+
+    python -m benchmarks.bench_http_clients
+"""
+
+import asyncio
+import time
+
+import httpx
+
+from app.http_clients import ClientSpec, HTTPClientRegistry
+
+CALLS = 2_000
+
+_RESPONSE = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"content-type: application/json\r\n"
+    b"content-length: 15\r\n"
+    b"\r\n"
+    b'{"data":"ok"}\r\n'
+)
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            if length:
+                await reader.readexactly(length)
+            writer.write(_RESPONSE)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _per_call(base_url: str) -> float:
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        async with httpx.AsyncClient() as client:
+            response = await client.post(f"{base_url}/push", json={"to": "x"}, timeout=10.0)
+            response.raise_for_status()
+    return (time.perf_counter() - start) / CALLS * 1_000_000
+
+
+async def _shared(base_url: str) -> float:
+    registry = HTTPClientRegistry()
+    registry.register("bench", ClientSpec(
+        base_url=base_url,
+        timeout=httpx.Timeout(10.0),
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+    ))
+    registry.open()
+    client = registry.get("bench")
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        response = await client.post("/push", json={"to": "x"})
+        response.raise_for_status()
+    elapsed = time.perf_counter() - start
+    await registry.aclose()
+    return elapsed / CALLS * 1_000_000
+
+
+async def main() -> None:
+    server = await asyncio.start_server(_handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+    async with server:
+        await _shared(base_url)  # warm-up
+        per_call = await _per_call(base_url)
+        shared = await _shared(base_url)
+    print(f"{CALLS} sequential POSTs over loopback")
+    print(f"  client per call: {per_call:8.1f} µs/call")
+    print(f"  shared client:   {shared:8.1f} µs/call  ({per_call / shared:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,41 @@
+"""
+Micro-benchmark: JWT verifications per second.
+
+Compares the raw library decode against the cached verifier for both
+backends. Run from backend/:
+
+    python -m benchmarks.bench_jwt
+"""
+
+import time
+import uuid
+
+from app.services.auth import create_access_token
+from app.services.jwt_verifier import TokenVerifier
+from app.config import settings
+
+ITERATIONS = 20_000
+
+
+def _rate(fn, iterations: int = ITERATIONS) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - start)
+
+
+def main() -> None:
+    token = create_access_token(str(uuid.uuid4()))
+
+    for backend in ("jose", "pyjwt"):
+        uncached = TokenVerifier(settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM, backend=backend, max_size=0)
+        cached = TokenVerifier(settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM, backend=backend)
+        cached.decode(token)
+
+        raw = _rate(lambda: uncached.backend.decode(token))
+        hit = _rate(lambda: cached.decode(token))
+        print(f"{backend:>6}  uncached: {raw:>12,.0f} verifications/s   cached: {hit:>12,.0f} verifications/s")
+
+
+if __name__ == "__main__":
+    main()
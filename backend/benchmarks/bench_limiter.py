@@ -0,0 +1,60 @@
+"""
+Benchmark: rate limiter overhead per request.
+
+Times the same in-process route with and without the app's limiter applied,
+using whatever RATE_LIMIT_STORAGE_URI / RATE_LIMIT_STRATEGY are configured.
+Point the URI at a local Redis-compatible server to include the round trip:
+
+    RATE_LIMIT_STORAGE_URI=redis://localhost:6379/0 python -m benchmarks.bench_limiter
+"""
+
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+
+from app.config import settings
+from app.limiter import limiter
+
+REQUESTS = 5_000
+CLIENTS = 500  # distinct client IPs, so keys are spread like real traffic
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+    app.state.limiter = limiter
+
+    @app.get("/plain")
+    async def plain(request: Request):
+        return {}
+
+    @app.get("/limited")
+    @limiter.limit("1000000/hour")
+    async def limited(request: Request):
+        return {}
+
+    return app
+
+
+async def _measure(client: httpx.AsyncClient, path: str) -> float:
+    start = time.perf_counter()
+    for i in range(REQUESTS):
+        response = await client.get(path, headers={"x-forwarded-for": f"10.0.{i % CLIENTS // 256}.{i % 256}"})
+        response.raise_for_status()
+    return (time.perf_counter() - start) / REQUESTS * 1_000_000
+
+
+async def main() -> None:
+    transport = httpx.ASGITransport(app=_build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await _measure(client, "/plain")  # warm-up
+        plain = await _measure(client, "/plain")
+        limited = await _measure(client, "/limited")
+    print(f"storage={settings.RATE_LIMIT_STORAGE_URI} strategy={settings.RATE_LIMIT_STRATEGY}")
+    print(f"  unlimited route: {plain:8.1f} µs/request")
+    print(f"  limited route:   {limited:8.1f} µs/request  (+{limited - plain:.1f} µs limiter overhead)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
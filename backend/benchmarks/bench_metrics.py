@@ -0,0 +1,69 @@
+"""
+Benchmark: MetricsMiddleware overhead per request (target < 50 µs).
+
+Drives a routed FastAPI app directly through its ASGI interface — no HTTP
+client in the loop — once bare and once wrapped in MetricsMiddleware, and
+reports the difference. Run from backend/:
+
+    python -m benchmarks.bench_metrics
+"""
+
+import asyncio
+import sys
+import time
+
+from fastapi import FastAPI
+
+from app.metrics import MetricsMiddleware, render_metrics
+
+REQUESTS = 20_000
+BUDGET_US = 50.0
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/users/profile/{user_id}")
+    async def profile(user_id: str):
+        return {"id": user_id}
+
+    return app
+
+
+async def _drive(asgi_app, requests: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/users/profile/abc", "raw_path": b"/users/profile/abc",
+        "root_path": "", "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await asgi_app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+async def main() -> int:
+    app = _build_app()
+    instrumented = MetricsMiddleware(app)
+    await _drive(app, 1_000)  # warm-up
+    await _drive(instrumented, 1_000)
+
+    bare = await _drive(app, REQUESTS)
+    wrapped = await _drive(instrumented, REQUESTS)
+    overhead = wrapped - bare
+    print(f"  bare app:          {bare:7.1f} µs/request")
+    print(f"  with metrics:      {wrapped:7.1f} µs/request")
+    print(f"  overhead:          {overhead:7.1f} µs/request (budget {BUDGET_US:.0f} µs)")
+    print(f"  /metrics payload:  {len(render_metrics())} bytes")
+    return 0 if overhead < BUDGET_US else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,149 @@
+"""
+Replay weighted traffic against the API and write throughput/latency JSON.
+See benchmarks/loadtest/__init__.py for the full workflow.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from app.services.jwt_verifier import verifier
+from benchmarks.loadtest.scenarios import SCENARIOS, Context
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _summarize(latencies: list[float], statuses: dict, elapsed: float) -> dict:
+    count = len(latencies)
+    return {
+        "requests": count,
+        "rps": round(count / elapsed, 1) if elapsed else 0.0,
+        "ok": sum(n for status, n in statuses.items() if isinstance(status, int) and status < 400),
+        "rate_limited": statuses.get(429, 0),
+        "errors": sum(n for status, n in statuses.items() if not isinstance(status, int) or (status >= 400 and status != 429)),
+        "statuses": {str(status): n for status, n in sorted(statuses.items(), key=str)},
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50) * 1000, 2),
+            "p90": round(_percentile(latencies, 90) * 1000, 2),
+            "p99": round(_percentile(latencies, 99) * 1000, 2),
+            "max": round(max(latencies, default=0.0) * 1000, 2),
+            "mean": round(sum(latencies) / count * 1000, 2) if count else 0.0,
+        },
+    }
+
+
+def _git_commit() -> str:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _mint_tokens(user_ids: list[str]) -> list[str]:
+    # Long-lived access tokens so runs longer than ACCESS_TOKEN_EXPIRE_MINUTES keep working
+    exp = datetime.now(timezone.utc) + timedelta(hours=12)
+    return [verifier.encode({"sub": user_id, "exp": exp, "type": "access"}) for user_id in user_ids]
+
+
+async def _run(client: httpx.AsyncClient, ctx: Context, scenarios, total: int, concurrency: int):
+    weights = [s.weight for s in scenarios]
+    plan = ctx.rng.choices(scenarios, weights=weights, k=total)
+    results = {s.name: ([], {}) for s in scenarios}
+    remaining = iter(plan)
+
+    async def worker():
+        for scenario in remaining:
+            latencies, statuses = results[scenario.name]
+            start = time.perf_counter()
+            try:
+                response = await scenario.run(client, ctx)
+                status = response.status_code
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results, time.perf_counter() - start
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay weighted API traffic and report latency percentiles as JSON")
+    parser.add_argument("--graph", required=True, help="summary JSON written by benchmarks.loadtest.graph")
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--warmup", type=int, default=200, help="requests run (and discarded) before measuring")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--base-url", help="target a running server instead of the in-process ASGI app")
+    parser.add_argument("--scenarios", help="comma-separated subset, e.g. feed,profile")
+    parser.add_argument("--images", action="store_true", help="attach a JPEG to new posts (needs R2 or R2_ENDPOINT_URL)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write the JSON result here as well as stdout")
+    args = parser.parse_args()
+
+    with open(args.graph) as f:
+        graph = json.load(f)
+    scenarios = SCENARIOS
+    if args.scenarios:
+        wanted = set(args.scenarios.split(","))
+        scenarios = [s for s in SCENARIOS if s.name in wanted]
+    ctx = Context(graph, _mint_tokens(graph["user_ids"]), random.Random(args.seed), args.images)
+
+    async with contextlib.AsyncExitStack() as stack:
+        if args.base_url:
+            client_kwargs = {"base_url": args.base_url}
+        else:
+            from app.main import app
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            client_kwargs = {"transport": httpx.ASGITransport(app=app), "base_url": "http://loadtest"}
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        client = await stack.enter_async_context(httpx.AsyncClient(timeout=30.0, limits=limits, **client_kwargs))
+
+        if args.warmup:
+            await _run(client, ctx, scenarios, args.warmup, args.concurrency)
+        results, elapsed = await _run(client, ctx, scenarios, args.requests, args.concurrency)
+
+    all_latencies = [lat for latencies, _ in results.values() for lat in latencies]
+    all_statuses: dict = {}
+    for _, statuses in results.values():
+        for status, n in statuses.items():
+            all_statuses[status] = all_statuses.get(status, 0) + n
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "target": args.base_url or "asgi",
+        "config": {
+            "requests": args.requests, "concurrency": args.concurrency, "seed": args.seed,
+            "images": args.images, "graph_users": graph["users"], "graph_seed": graph["seed"],
+            "weights": {s.name: s.weight for s in scenarios},
+        },
+        "elapsed_s": round(elapsed, 3),
+        "total": _summarize(all_latencies, all_statuses, elapsed),
+        "scenarios": {name: _summarize(lat, st, elapsed) for name, (lat, st) in results.items()},
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    print(output)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
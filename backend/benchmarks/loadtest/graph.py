@@ -0,0 +1,184 @@
+"""
+Synthetic social graph generator.
+
+Friend counts follow a power law (a few very connected users, a long tail of
+users with a handful of friends), wired Chung-Lu style so well-connected users
+tend to befriend each other. On top of that: a sprinkle of pending requests
+and blocks, 1-3 goals per user (mostly friends-visible), posts from the last
+day (the feed window), and reactions from the owner's friends. Everything is
+drawn from one seeded RNG, so the same --users/--seed gives the same graph.
+
+The graph summary the scenarios need (who can see which posts, whose goals
+are open) is written as JSON alongside the database.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.engine import make_url
+
+import app.models  # noqa: F401  (register every table on Base.metadata)
+from app.config import settings
+from app.database import Base, engine
+from app.models.block import Block
+from app.models.friendship import Friendship
+from app.models.goal import Goal
+from app.models.notification import NotificationSettings
+from app.models.post import Post
+from app.models.reaction import Reaction
+from app.models.user import User
+from app.services.auth import EMOJI_TO_COLUMN, hash_password
+
+MAX_FRIENDS = 300
+PENDING_RATE = 0.05
+BLOCK_RATE = 0.01
+PRIVATE_GOAL_RATE = 0.2
+CHUNK = 2000
+
+
+def ensure_disposable_database(force: bool) -> bool:
+    database = make_url(settings.DATABASE_URL).database or ""
+    if force or "test" in database or "bench" in database:
+        return True
+    print(f"Refusing to drop and reseed database {database!r}; use a *_test/*_bench database or --force")
+    return False
+
+
+def _friend_counts(rng: random.Random, users: int) -> list[int]:
+    # Pareto(alpha=1.6) scaled to a median of ~4 friends
+    return [min(MAX_FRIENDS, int(rng.paretovariate(1.6) * 3)) for _ in range(users)]
+
+
+def build(users: int, seed: int) -> dict:
+    """Generate all rows in memory. Returns {"rows": {model: [...]}, "summary": {...}}."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    user_ids = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(users)]
+    # Hashing is deliberately slow — every synthetic user shares one hash
+    password_hash = hash_password("loadtest-password")
+
+    rows: dict = {model: [] for model in (User, NotificationSettings, Friendship, Block, Goal, Post, Reaction)}
+    for n, user_id in enumerate(user_ids):
+        rows[User].append({
+            "id": user_id, "username": f"lt{n}", "name": f"Load Test {n}", "email": f"lt{n}@example.test",
+            "password_hash": password_hash, "email_verified": True, "created_at": now - timedelta(days=30),
+        })
+        rows[NotificationSettings].append({"id": uuid.UUID(int=rng.getrandbits(128), version=4), "user_id": user_id})
+
+    # Chung-Lu wiring: each user picks partners with probability ∝ target degree
+    degrees = _friend_counts(rng, users)
+    friends: dict[int, set[int]] = {i: set() for i in range(users)}
+    seen_pairs: set[tuple[int, int]] = set()
+    for i, degree in enumerate(degrees):
+        for j in rng.choices(range(users), weights=degrees, k=max(1, degree // 2)):
+            pair = (min(i, j), max(i, j))
+            if i == j or pair in seen_pairs:
+                continue
+            seen_pairs.add(pair)
+            pending = rng.random() < PENDING_RATE
+            rows[Friendship].append({
+                "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+                "user_id": user_ids[i], "friend_id": user_ids[j],
+                "status": "pending" if pending else "accepted",
+            })
+            if not pending:
+                friends[i].add(j)
+                friends[j].add(i)
+
+    blocked: set[tuple[int, int]] = set()
+    for i in range(users):
+        if rng.random() < BLOCK_RATE:
+            j = rng.randrange(users)
+            if j != i and j not in friends[i]:
+                blocked.add((i, j))
+                rows[Block].append({"id": uuid.UUID(int=rng.getrandbits(128), version=4), "blocker_id": user_ids[i], "blocked_id": user_ids[j]})
+
+    open_goals: dict[int, list[str]] = {}
+    visible_posts: dict[int, list[str]] = {}  # owner -> posts their friends may react to
+    for i, user_id in enumerate(user_ids):
+        for g in range(rng.randint(1, 3)):
+            goal_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+            private = rng.random() < PRIVATE_GOAL_RATE
+            rows[Goal].append({
+                "id": goal_id, "user_id": user_id, "title": f"goal {i}.{g}",
+                "privacy": "private" if private else "friends",
+                "streak_count": rng.randint(0, 60), "streak_interval": 1,
+                "last_posted_at": now - timedelta(hours=rng.uniform(0, 20)),
+                "created_at": now - timedelta(days=20),
+            })
+            open_goals.setdefault(i, []).append(str(goal_id))
+            for _ in range(rng.choice((0, 1, 1, 2, 3))):
+                post_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+                post = {
+                    "id": post_id, "user_id": user_id, "goal_id": goal_id,
+                    "caption": "synthetic post", "created_at": now - timedelta(hours=rng.uniform(0, 20)),
+                    **{column: 0 for column in EMOJI_TO_COLUMN.values()},
+                }
+                rows[Post].append(post)
+                if private:
+                    continue
+                visible_posts.setdefault(i, []).append(str(post_id))
+                reactors = list(friends[i])
+                rng.shuffle(reactors)
+                for j in reactors[:min(len(reactors), int(rng.paretovariate(1.3)))]:
+                    emoji = rng.choice(list(EMOJI_TO_COLUMN))
+                    post[EMOJI_TO_COLUMN[emoji]] += 1
+                    rows[Reaction].append({
+                        "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+                        "post_id": post_id, "user_id_who_reacted": user_ids[j], "react_emoji": emoji,
+                    })
+
+    summary = {
+        "users": users,
+        "seed": seed,
+        "generated_at": now.isoformat(),
+        "user_ids": [str(u) for u in user_ids],
+        "friends": {str(i): sorted(f) for i, f in friends.items() if f},
+        "open_goals": {str(i): goals for i, goals in open_goals.items()},
+        "visible_posts": {str(i): posts for i, posts in visible_posts.items()},
+        "counts": {model.__tablename__: len(model_rows) for model, model_rows in rows.items()},
+    }
+    return {"rows": rows, "summary": summary}
+
+
+async def load(rows: dict) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with engine.begin() as conn:
+        for model, model_rows in rows.items():
+            for i in range(0, len(model_rows), CHUNK):
+                await conn.execute(insert(model), model_rows[i:i + CHUNK])
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the synthetic social graph in Postgres")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default="loadtest-graph.json", help="where to write the graph summary")
+    parser.add_argument("--force", action="store_true", help="allow a database name without 'test'/'bench'")
+    args = parser.parse_args()
+
+    if not ensure_disposable_database(args.force):
+        return 2
+
+    start = time.perf_counter()
+    graph = build(args.users, args.seed)
+    await load(graph["rows"])
+    await engine.dispose()
+    with open(args.out, "w") as f:
+        json.dump(graph["summary"], f)
+    counts = ", ".join(f"{n} {table}" for table, n in graph["summary"]["counts"].items())
+    print(f"Generated {counts} in {time.perf_counter() - start:.1f}s -> {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,102 @@
+"""
+Weighted request scenarios. Each picks a virtual user from the graph and
+issues one API call as them; weights approximate the app's traffic mix
+(mostly feed reads, then reactions, profile and friend-list views, and a
+small share of new posts).
+"""
+
+import io
+import random
+
+import httpx
+from PIL import Image
+
+from app.services.auth import EMOJI_TO_COLUMN
+
+EMOJIS = list(EMOJI_TO_COLUMN)
+
+
+class Scenario:
+    def __init__(self, name: str, weight: int, run):
+        self.name = name
+        self.weight = weight
+        self.run = run
+
+
+class Context:
+    """Graph summary plus per-user auth headers, shared by all scenarios."""
+
+    def __init__(self, graph: dict, tokens: list[str], rng: random.Random, images: bool):
+        self.user_ids: list[str] = graph["user_ids"]
+        self.friends: dict[str, list[int]] = graph["friends"]
+        self.open_goals: dict[str, list[str]] = graph["open_goals"]
+        self.visible_posts: dict[str, list[str]] = graph["visible_posts"]
+        self.tokens = tokens
+        self.rng = rng
+        self.image = _sample_jpeg() if images else None
+        # Users with at least one friend, so social scenarios always have a target
+        self.social_users = [int(i) for i in self.friends]
+
+    def headers(self, user: int) -> dict:
+        # Distinct client IPs per user so the per-IP limiter behaves as in production
+        return {
+            "authorization": f"Bearer {self.tokens[user]}",
+            "x-forwarded-for": f"10.{user >> 16 & 255}.{user >> 8 & 255}.{user & 255}",
+        }
+
+
+def _sample_jpeg() -> bytes:
+    buf = io.BytesIO()
+    Image.effect_noise((1600, 1200), 64).convert("RGB").save(buf, format="JPEG", quality=85)
+    return buf.getvalue()
+
+
+async def feed(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    user = ctx.rng.choice(ctx.social_users)
+    return await client.get("/posts/feed", headers=ctx.headers(user))
+
+
+async def toggle_reaction(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    user = ctx.rng.choice(ctx.social_users)
+    owners = [f for f in ctx.friends[str(user)] if str(f) in ctx.visible_posts]
+    if not owners:
+        return await feed(client, ctx)
+    post_id = ctx.rng.choice(ctx.visible_posts[str(ctx.rng.choice(owners))])
+    emoji = ctx.rng.choice(EMOJIS)
+    return await client.post("/reactions/toggle", json={"post_id": post_id, "react_emoji": emoji}, headers=ctx.headers(user))
+
+
+async def profile(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    user = ctx.rng.choice(ctx.social_users)
+    # Mostly friends' profiles, sometimes a stranger's
+    if ctx.rng.random() < 0.8:
+        target = ctx.rng.choice(ctx.friends[str(user)])
+    else:
+        target = ctx.rng.randrange(len(ctx.user_ids))
+    return await client.get(f"/users/profile/{ctx.user_ids[target]}", headers=ctx.headers(user))
+
+
+async def friends_list(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    user = ctx.rng.choice(ctx.social_users)
+    return await client.get("/friends/", headers=ctx.headers(user))
+
+
+async def create_post(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    user = ctx.rng.randrange(len(ctx.user_ids))
+    goal_id = ctx.rng.choice(ctx.open_goals[str(user)])
+    files = {"image": ("photo.jpg", ctx.image, "image/jpeg")} if ctx.image else None
+    return await client.post(
+        "/posts/",
+        data={"goal_id": goal_id, "caption": "load test post"},
+        files=files,
+        headers=ctx.headers(user),
+    )
+
+
+SCENARIOS = [
+    Scenario("feed", 45, feed),
+    Scenario("toggle_reaction", 25, toggle_reaction),
+    Scenario("profile", 12, profile),
+    Scenario("friends_list", 13, friends_list),
+    Scenario("create_post", 5, create_post),
+]
@@ -0,0 +1,162 @@
+"""
+Micro-benchmarks of hot functions, with a stored baseline and a regression gate.
+
+Each benchmark is timed with timeit (best of several repeats) and divided by a
+fixed pure-Python calibration loop timed the same way, so the stored figures
+are "cost relative to this machine's interpreter speed" and stay comparable
+across laptops and CI runners. A run fails (exit 1) if any benchmark is more
+than --threshold percent slower than its baseline.
+
+    python -m benchmarks.micro                    # compare against the baseline
+    python -m benchmarks.micro --threshold 10     # stricter gate
+    python -m benchmarks.micro --save-baseline    # accept the current numbers
+    python -m benchmarks.micro --filter token     # only benchmarks matching "token"
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import timeit
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from PIL import Image
+
+from app.models.goal import Goal
+from app.models.post import Post
+from app.models.user import User
+from app.routers.notifications import _streak_reminder
+from app.routers.posts import _assemble_feed, _post_to_response, _process_post_image
+from app.routers.users import _compress_profile_picture
+from app.services.auth import create_access_token, decode_token
+from app.services.jwt_verifier import verifier
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "micro_baseline.json")
+DEFAULT_THRESHOLD = 15.0  # percent
+REPEATS = 5
+
+
+def _calibrate() -> None:
+    total = 0
+    for i in range(10_000):
+        total += i * i % 7
+    "-".join(str(i) for i in range(200))
+
+
+def _jpeg(size: tuple[int, int]) -> bytes:
+    buf = io.BytesIO()
+    Image.effect_noise(size, 48).convert("RGB").save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+def _feed_rows(n: int, viewer_id: uuid.UUID) -> list[tuple]:
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i in range(n):
+        owner = User(id=viewer_id if i % 10 == 0 else uuid.uuid4(), username=f"user{i}", profile_picture_url=None, is_subscribed=i % 3 == 0)
+        goal = Goal(id=uuid.uuid4(), user_id=owner.id, title=f"goal {i}", privacy="private" if i % 7 == 0 else "friends", archived=False, streak_count=i)
+        post = Post(
+            id=uuid.uuid4(), user_id=owner.id, goal_id=goal.id, image_url=f"https://cdn.example/{i}.jpg",
+            caption="caption", created_at=now - timedelta(minutes=i),
+            reaction_fire=i, reaction_fist=0, reaction_party=1, reaction_heart=2,
+        )
+        rows.append((post, owner, goal, "🔥" if i % 4 == 0 else None))
+    return rows
+
+
+def _streak_goals(n: int, now: datetime) -> list[Goal]:
+    return [
+        Goal(
+            id=uuid.uuid4(), title=f"goal {i}", streak_count=i, streak_interval=1 + i % 3,
+            last_posted_at=now - timedelta(hours=i % 70),
+            notification_time=now - timedelta(hours=i % 5) if i % 2 else None,
+        )
+        for i in range(n)
+    ]
+
+
+def build_benchmarks() -> dict:
+    """name -> zero-argument callable. Fixtures are built once, outside the timing."""
+    viewer_id = uuid.uuid4()
+    feed_rows = _feed_rows(200, viewer_id)
+    post, owner, goal, _ = feed_rows[1]
+    photo = _jpeg((2400, 1800))
+    avatar = _jpeg((1200, 1600))
+    now = datetime.now(timezone.utc)
+    goals = _streak_goals(1000, now)
+    token = create_access_token(str(viewer_id))
+    decode_token(token)  # warm the verifier cache for the cached-hit case
+
+    return {
+        "post_to_response": lambda: _post_to_response(post, owner, goal),
+        "assemble_feed_200": lambda: _assemble_feed(feed_rows, viewer_id),
+        "process_post_image_2400x1800": lambda: _process_post_image(photo),
+        "compress_profile_picture_1200x1600": lambda: _compress_profile_picture(avatar),
+        "create_access_token": lambda: create_access_token(str(viewer_id)),
+        "decode_token_cached": lambda: decode_token(token),
+        "decode_token_uncached": lambda: verifier.backend.decode(token),
+        "streak_reminder_1000_goals": lambda: [_streak_reminder(g, now) for g in goals],
+    }
+
+
+def _time(fn) -> float:
+    """Best-of-REPEATS seconds per call."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=REPEATS, number=number)) / number
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Hot-path micro-benchmarks with a regression gate")
+    parser.add_argument("--threshold", type=float, default=float(os.environ.get("BENCH_REGRESSION_THRESHOLD", DEFAULT_THRESHOLD)),
+                        help="max allowed slowdown vs baseline, in percent")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="write this run's numbers as the new baseline")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    args = parser.parse_args()
+
+    benchmarks = {name: fn for name, fn in build_benchmarks().items() if args.filter in name}
+    calibration = _time(_calibrate)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["relative_cost"]
+
+    results = {}
+    regressions = []
+    print(f"{'benchmark':38} {'µs/call':>12} {'relative':>10} {'baseline':>10} {'change':>8}")
+    for name, fn in benchmarks.items():
+        seconds = _time(fn)
+        relative = seconds / calibration
+        results[name] = relative
+        line = f"{name:38} {seconds * 1e6:12.2f} {relative:10.4f}"
+        if name in baseline:
+            change = (relative / baseline[name] - 1) * 100
+            flag = ""
+            if change > args.threshold:
+                regressions.append(name)
+                flag = "  REGRESSION"
+            line += f" {baseline[name]:10.4f} {change:+7.1f}%{flag}"
+        else:
+            line += f" {'-':>10} {'new':>8}"
+        print(line)
+
+    if args.save_baseline:
+        merged = {**baseline, **results}
+        with open(args.baseline, "w") as f:
+            json.dump({"relative_cost": dict(sorted(merged.items()))}, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) more than {args.threshold:.0f}% slower than baseline: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+Smoke/throughput check for DB_POOLER_MODE=transaction against a local PgBouncer.
+
+Runs many concurrent sessions, each issuing several parameterised statements
+inside and across transactions — the pattern that breaks asyncpg's prepared
+statement cache when PgBouncer reassigns server connections. Exits non-zero
+on the first failure. Run from backend/ with the compose pgbouncer profile up:
+
+    DATABASE_URL=postgresql+asyncpg://streakd:<password>@localhost:6432/streakd \\
+    DB_POOLER_MODE=transaction python -m benchmarks.pgbouncer_smoke
+"""
+
+import asyncio
+import sys
+import time
+
+from sqlalchemy import select, func, text
+
+from app.config import settings
+from app.database import async_session, engine
+from app.models.user import User
+
+CONCURRENCY = 50
+ROUNDS = 20
+
+
+async def _worker(worker_id: int) -> None:
+    for i in range(ROUNDS):
+        async with async_session() as db:
+            await db.execute(select(func.count()).select_from(User))
+            await db.execute(text("SELECT CAST(:a AS int) + CAST(:b AS int)"), {"a": worker_id, "b": i})
+            await db.commit()
+            await db.execute(select(User.id).where(User.username == f"nobody_{worker_id}_{i}"))
+
+
+async def main() -> int:
+    if settings.DB_POOLER_MODE != "transaction":
+        print("DB_POOLER_MODE is not 'transaction' — this check is meant to run through PgBouncer")
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(_worker(n) for n in range(CONCURRENCY)))
+    except Exception as e:
+        print(f"FAILED: {type(e).__name__}: {e}")
+        return 1
+    finally:
+        await engine.dispose()
+    elapsed = time.perf_counter() - start
+    sessions = CONCURRENCY * ROUNDS
+    print(f"OK: {sessions} sessions in {elapsed:.2f}s ({sessions / elapsed:,.0f} sessions/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
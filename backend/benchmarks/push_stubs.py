@@ -0,0 +1,166 @@
+"""
+Local stand-ins for the push providers, for load tests without network access.
+
+ExpoStub speaks HTTP/1.1 (keep-alive) and answers /--/api/v2/push/send with an
+Expo push ticket; APNsStub speaks cleartext HTTP/2 (prior knowledge) and
+answers /3/device/<token> like APNs. Both add `latency` seconds per request
+and fail `error_rate` of requests with the provider's dead-token response
+(DeviceNotRegistered / 410 Unregistered), so the feedback pipeline is
+exercised too.
+
+    async with ExpoStub(latency=0.05) as expo, APNsStub(latency=0.02) as apns:
+        ...  # expo.url, apns.url
+
+In-process stubs share the event loop (and CPU) with whatever is under test.
+To keep them out of the measurement, run them as a separate process and pass
+the printed URLs to the load test:
+
+    python -m benchmarks.push_stubs --latency-ms 30 --error-rate 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import random
+
+import h2.config
+import h2.connection
+import h2.events
+
+
+class _Stub:
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, port: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.port = port
+        self.requests = 0
+        self.errors = 0
+        self._server: asyncio.Server | None = None
+
+    @property
+    def url(self) -> str:
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    def _should_fail(self) -> bool:
+        self.requests += 1
+        if self.error_rate and random.random() < self.error_rate:
+            self.errors += 1
+            return True
+        return False
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        raise NotImplementedError
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", self.port)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        await self._server.wait_closed()
+
+
+class ExpoStub(_Stub):
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if self._should_fail():
+                    ticket = {"status": "error", "message": "not registered", "details": {"error": "DeviceNotRegistered"}}
+                else:
+                    ticket = {"status": "ok", "id": f"ticket-{self.requests}"}
+                body = json.dumps({"data": ticket}).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\ncontent-type: application/json\r\n"
+                    b"content-length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+class APNsStub(_Stub):
+    async def _handle(self, reader, writer):
+        conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False))
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+        lock = asyncio.Lock()
+        responders: set[asyncio.Task] = set()
+
+        async def respond(stream_id: int) -> None:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if self._should_fail():
+                body = b'{"reason":"Unregistered","timestamp":0}'
+                headers = [(":status", "410"), ("content-type", "application/json"), ("content-length", str(len(body)))]
+            else:
+                body = b""
+                headers = [(":status", "200"), ("apns-id", f"stub-{stream_id}")]
+            async with lock:
+                conn.send_headers(stream_id, headers, end_stream=not body)
+                if body:
+                    conn.send_data(stream_id, body, end_stream=True)
+                writer.write(conn.data_to_send())
+                await writer.drain()
+
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                async with lock:
+                    events = conn.receive_data(data)
+                    for event in events:
+                        if isinstance(event, h2.events.DataReceived):
+                            conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                        elif isinstance(event, h2.events.StreamEnded):
+                            task = asyncio.get_running_loop().create_task(respond(event.stream_id))
+                            responders.add(task)
+                            task.add_done_callback(responders.discard)
+                        elif isinstance(event, h2.events.ConnectionTerminated):
+                            return
+                    writer.write(conn.data_to_send())
+                    await writer.drain()
+        except ConnectionResetError:
+            pass
+        finally:
+            for task in responders:
+                task.cancel()
+            writer.close()
+
+
+async def _serve(args) -> None:
+    latency = args.latency_ms / 1000
+    async with ExpoStub(latency, args.error_rate, args.expo_port) as expo, \
+            APNsStub(latency, args.error_rate, args.apns_port) as apns:
+        print(f"--expo-url {expo.url} --apns-url {apns.url}", flush=True)
+        try:
+            while True:
+                await asyncio.sleep(10)
+                print(f"expo {expo.requests} ({expo.errors} dead)  apns {apns.requests} ({apns.errors} dead)", flush=True)
+        except asyncio.CancelledError:
+            pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Expo/APNs stubs standalone")
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--expo-port", type=int, default=0)
+    parser.add_argument("--apns-port", type=int, default=0)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
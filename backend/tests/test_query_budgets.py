@@ -0,0 +1,62 @@
+import pytest
+
+from app.database import async_session
+from app.models.friendship import Friendship
+from app.models.goal import Goal
+from app.models.post import Post
+from app.models.user import User
+from app.query_budget import before_query
+from app.services.auth import create_access_token
+
+
+@pytest.fixture
+async def viewer(database):
+    """A verified user with one friend, who has a goal and a post in the feed window.
+    Returns (viewer, friend, auth headers)."""
+    async with async_session() as db:
+        viewer = User(username="viewer", email="viewer@example.test", password_hash="x", email_verified=True)
+        friend = User(username="friend", email="friend@example.test", password_hash="x", email_verified=True)
+        db.add_all([viewer, friend])
+        await db.flush()
+        goal = Goal(user_id=friend.id, title="Run every day", privacy="friends")
+        db.add_all([goal, Friendship(user_id=viewer.id, friend_id=friend.id, status="accepted")])
+        await db.flush()
+        db.add(Post(user_id=friend.id, goal_id=goal.id, caption="day one"))
+        await db.commit()
+    headers = {"authorization": f"Bearer {create_access_token(str(viewer.id))}"}
+    return viewer, friend, headers
+
+
+@pytest.mark.anyio
+async def test_feed_within_budget(client, viewer, query_budget):
+    _, _, headers = viewer
+    with query_budget("GET /posts/feed"):
+        response = await client.get("/posts/feed", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+
+
+@pytest.mark.anyio
+async def test_feed_revalidation_within_budget(client, viewer, query_budget):
+    _, _, headers = viewer
+    etag = (await client.get("/posts/feed", headers=headers)).headers["etag"]
+    # A matching If-None-Match skips the feed query itself
+    with query_budget("GET /posts/feed", max_queries=4):
+        response = await client.get("/posts/feed", headers={**headers, "if-none-match": etag})
+    assert response.status_code == 304
+
+
+@pytest.mark.anyio
+async def test_profile_within_budget(client, viewer, query_budget):
+    _, friend, headers = viewer
+    with query_budget("GET /users/profile/{user_id}"):
+        response = await client.get(f"/users/profile/{friend.id}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["post_count"] == 1
+
+
+def test_query_budget_fixture_flags_overrun(query_budget):
+    with pytest.raises(AssertionError, match="ran 3 queries"):
+        with query_budget("GET /example", max_queries=2):
+            for _ in range(3):
+                before_query()  # what the engine hook calls per statement
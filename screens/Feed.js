@@ -18,7 +18,7 @@ import { UsersIcon, PlusIcon, XIcon, FireIcon } from 'phosphor-react-native';
 import PostCard from '../components/feed/PostCard';
 import UserProfileModal from '../components/UserProfileModal';
 import { useAuth } from '../contexts/AuthContext';
-import { getFeedPosts, getUserReactionsForPosts } from '../services/posts';
+import { getFeedPosts } from '../services/posts';
 import { getUserActiveGoals } from '../services/goals';
 import { formatTimestamp } from '../utils/formatTimestamp';
 
@@ -64,12 +64,12 @@ export default function Feed({ navigation, route }) {
 
       console.log('✅ Loaded posts:', feedPosts?.length || 0);
 
-      // Batch fetch user reactions for all posts
-      if (feedPosts && feedPosts.length > 0) {
-        const postIds = feedPosts.map(p => p.id);
-        const { reactions } = await getUserReactionsForPosts(user.id, postIds);
-        setUserReactions(reactions);
-      }
+      // The feed includes the viewer's own reaction on each post
+      const reactions = {};
+      feedPosts?.forEach(p => {
+        if (p.user_reaction) reactions[p.id] = p.user_reaction;
+      });
+      setUserReactions(reactions);
 
       setPosts(feedPosts || []);
     } catch (error) {
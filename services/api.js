@@ -28,6 +28,7 @@ export const saveTokens = async (access, refresh) => {
 };
 
 export const clearTokens = async () => {
+  etagCache.clear();
   await Promise.all([
     AsyncStorage.removeItem(TOKEN_KEYS.ACCESS),
     AsyncStorage.removeItem(TOKEN_KEYS.REFRESH),
@@ -109,16 +110,31 @@ export const apiFetch = async (path, options = {}) => {
   return res;
 };
 
+// Last ETag + body per GET path. Endpoints that send an ETag answer a
+// matching If-None-Match with an empty 304, and the cached body is reused.
+const etagCache = new Map();
+
 /**
- * Convenience: GET with auth
+ * Convenience: GET with auth (conditional when we hold an ETag for the path)
  */
 export const apiGet = async (path) => {
-  const res = await apiFetch(path);
+  const cached = etagCache.get(path);
+  const res = await apiFetch(path, cached ? { headers: { 'If-None-Match': cached.etag } } : {});
+  if (res.status === 304 && cached) {
+    return cached.data;
+  }
   if (!res.ok) {
     const err = await res.json().catch(() => ({}));
     throw new Error(err.detail || `GET ${path} failed (${res.status})`);
   }
-  return res.json();
+  const data = await res.json();
+  const etag = res.headers.get('ETag');
+  if (etag) {
+    etagCache.set(path, { etag, data });
+  } else {
+    etagCache.delete(path);
+  }
+  return data;
 };
 
 /**
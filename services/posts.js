@@ -69,8 +69,12 @@ export const createPost = async (userId, goalId, imageUri) => {
   }
 };
 
+const REACTION_LOOKUP_CHUNK = 200; // backend cap per request
+
 /**
- * Batch fetch user reactions for multiple posts
+ * Batch fetch user reactions for multiple posts.
+ * The feed already includes `user_reaction` on each post; this is for
+ * screens whose post lists don't (e.g. goal feeds).
  */
 export const getUserReactionsForPosts = async (userId, postIds) => {
   if (!postIds || postIds.length === 0) {
@@ -78,12 +82,18 @@ export const getUserReactionsForPosts = async (userId, postIds) => {
   }
 
   try {
-    const data = await apiGet(`/reactions/user?post_ids=${postIds.join(',')}`);
+    const chunks = [];
+    for (let i = 0; i < postIds.length; i += REACTION_LOOKUP_CHUNK) {
+      chunks.push(postIds.slice(i, i + REACTION_LOOKUP_CHUNK));
+    }
+    const results = await Promise.all(
+      chunks.map(ids => apiPost('/reactions/user/batch', { post_ids: ids }))
+    );
 
     // Convert array to map: { postId: emoji }
     const reactions = {};
-    data?.forEach(r => {
-      reactions[r.post_id] = r.react_emoji;
+    results.flat().forEach(r => {
+      if (r) reactions[r.post_id] = r.react_emoji;
     });
 
     return { reactions, error: null };